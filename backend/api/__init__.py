@@ -31,6 +31,7 @@ from .admin.admin_patient import (
 )
 from .admin.task import *
 from .admin.AdminPatientHistory import AdminPatientHistoryAPI
+from .admin.db_stats import AdminDbPoolStats
 
 # ============================
 # DOCTOR ENDPOINTS
@@ -38,7 +39,9 @@ from .admin.AdminPatientHistory import AdminPatientHistoryAPI
 from .doctor.dashboard import DoctorDashboard
 from .doctor.availibility import (
     DoctorAvailabilityList,
+    DoctorAvailabilityBulk,
     DoctorAvailabilityDetail,
+    DoctorWeeklyScheduleAPI,
 )
 from .doctor.appointments import (
     DoctorAppointments,
@@ -56,7 +59,7 @@ from .patient.dashboard import PatientDashboard
 from .patient.appointment import *
 from .patient.records import PatientMedicalRecordsAPI
 from .patient.profile import PatientProfileAPI
-from .patient.export import PatientExportTreatmentsAPI
+from .patient.export import PatientExportTreatmentsAPI, PatientExportStatusAPI
 
 # ============================
 # TEST ENDPOINTS
@@ -81,7 +84,10 @@ def register_routes(api):
     # ADMIN
     # ============================
     api.add_resource(AdminDashboard, "/admin/dashboard")
+    api.add_resource(TaskLogListAPI, "/admin/tasks")
+    api.add_resource(TaskLatencyStatsAPI, "/admin/tasks/stats")
     api.add_resource(TaskLogsAPI, "/admin/tasks/<string:task_id>")
+    api.add_resource(AdminDbPoolStats, "/admin/db/pool")
 
     api.add_resource(AdminSpecializations, "/admin/specializations")
     api.add_resource(
@@ -137,6 +143,8 @@ def register_routes(api):
     api.add_resource(DoctorProfileMe, "/doctor/profile")
 
     api.add_resource(DoctorAvailabilityList, "/doctor/availability")
+    api.add_resource(DoctorAvailabilityBulk, "/doctor/availability/bulk")
+    api.add_resource(DoctorWeeklyScheduleAPI, "/doctor/schedule")
     api.add_resource(
         DoctorAvailabilityDetail,
         "/doctor/availability/<int:slot_id>",
@@ -166,12 +174,17 @@ def register_routes(api):
     api.add_resource(PatientMedicalRecordsAPI, "/patient/records")
     api.add_resource(PatientProfileAPI, "/patient/profile")
     api.add_resource(PatientExportTreatmentsAPI, "/patient/export-treatments")
+    api.add_resource(PatientExportStatusAPI, "/patient/export-treatments/<string:task_id>")
 
     api.add_resource(PatientDoctorListAPI, "/patient/doctors")
     api.add_resource(
         PatientDoctorDetailAPI,
         "/patient/doctors/<int:doctor_id>",
     )
+    api.add_resource(
+        PatientEarliestSlotsAPI,
+        "/patient/doctors/earliest-slots",
+    )
     api.add_resource(
         PatientDoctorAvailabilityAPI,
         "/patient/doctors/<int:doctor_id>/availability",
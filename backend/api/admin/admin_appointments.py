@@ -1,6 +1,11 @@
 from flask_restful import Resource, reqparse
-from flask_jwt_extended import jwt_required, get_jwt
+from flask import request
+from utils.auth import admin_required
+from utils.serializers import admin_appointment, dump_many
 from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 from database import get_db_session
 from models import (
@@ -11,8 +16,19 @@ from models import (
     MedicalRecord
 )
 
-def require_admin():
-    return get_jwt().get("role", "").upper() == "ADMIN"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(appt):
+    return f"{appt.date.isoformat()}_{appt.time.strftime('%H:%M:%S')}_{appt.id}"
+
+def decode_cursor(cursor):
+    c_date, c_time, c_id = cursor.split("_")
+    return (
+        datetime.strptime(c_date, "%Y-%m-%d").date(),
+        datetime.strptime(c_time, "%H:%M:%S").time(),
+        int(c_id),
+    )
 
 appt_parser = reqparse.RequestParser()
 appt_parser.add_argument("doctor_id", type=int)
@@ -24,64 +40,103 @@ appt_parser.add_argument("notes")
 
 class AdminAppointments(Resource):
 
-    @jwt_required()
+    @admin_required
     def get(self):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
+        """
+        Optional query params:
+        - status: pending / confirmed / completed / cancelled
+        - doctor_id, patient_id
+        - date_from: YYYY-MM-DD
+        - date_to: YYYY-MM-DD
+        - limit: page size (default 50, max 200)
+        - cursor: next_cursor returned by the previous page
+        """
         session = get_db_session()
 
+        q = session.query(Appointment).options(
+            joinedload(Appointment.doctor).joinedload(DoctorProfile.specialization),
+            joinedload(Appointment.doctor).joinedload(DoctorProfile.user),
+            joinedload(Appointment.patient).joinedload(PatientProfile.user),
+            joinedload(Appointment.medical_record),
+        )
+
+        status = request.args.get("status")
+        if status:
+            try:
+                st = AppointmentStatus(status.lower())
+            except ValueError:
+                return {"message": "Invalid status"}, 400
+            q = q.filter(Appointment.status == st)
+
+        doctor_id = request.args.get("doctor_id", type=int)
+        if doctor_id:
+            q = q.filter(Appointment.doctor_id == doctor_id)
+
+        patient_id = request.args.get("patient_id", type=int)
+        if patient_id:
+            q = q.filter(Appointment.patient_id == patient_id)
+
+        df = request.args.get("date_from")
+        dt = request.args.get("date_to")
+
+        if df:
+            try:
+                df_val = datetime.strptime(df, "%Y-%m-%d").date()
+                q = q.filter(Appointment.date >= df_val)
+            except ValueError:
+                return {"message": "Invalid date_from"}, 400
+
+        if dt:
+            try:
+                dt_val = datetime.strptime(dt, "%Y-%m-%d").date()
+                q = q.filter(Appointment.date <= dt_val)
+            except ValueError:
+                return {"message": "Invalid date_to"}, 400
+
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                c_date, c_time, c_id = decode_cursor(cursor)
+            except ValueError:
+                return {"message": "Invalid cursor"}, 400
+
+            q = q.filter(
+                or_(
+                    Appointment.date < c_date,
+                    and_(Appointment.date == c_date, Appointment.time < c_time),
+                    and_(
+                        Appointment.date == c_date,
+                        Appointment.time == c_time,
+                        Appointment.id < c_id,
+                    ),
+                )
+            )
+
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
         appts = (
-            session.query(Appointment)
-            .order_by(Appointment.date.desc(), Appointment.time.desc())
+            q.order_by(
+                Appointment.date.desc(),
+                Appointment.time.desc(),
+                Appointment.id.desc(),
+            )
+            .limit(limit + 1)
             .all()
         )
 
-        result = []
-        for a in appts:
-            record = a.medical_record
-
-            result.append({
-                "id": a.id,
-                "date": a.date.isoformat(),
-                "time": a.time.strftime("%H:%M"),
-                "status": a.status.value,
-                "notes": a.notes,
-                "doctor": {
-                    "id": a.doctor.id,
-                    "name": a.doctor.full_name,
-                    "specialization": (
-                        a.doctor.specialization.name
-                        if a.doctor.specialization else None
-                    ),
-                    "email": a.doctor.user.email if a.doctor.user else None
-                } if a.doctor else None,
-                "patient": {
-                    "id": a.patient.id,
-                    "name": a.patient.user.name if a.patient.user else None,
-                    "email": a.patient.user.email if a.patient.user else None,
-                    "age": a.patient.age,
-                    "gender": a.patient.gender,
-                    "phone": a.patient.phone
-                } if a.patient else None,
-                "record": {
-                    "id": record.id if record else None,
-                    "visit_type": record.visit_type if record else None,
-                    "tests": record.tests_done if record else None,
-                    "diagnosis": record.diagnosis if record else None,
-                    "medicines": record.medicines if record else None,
-                    "prescription": record.prescription if record else None,
-                    "notes": record.notes if record else None,
-                } if record else None
-            })
-
-        return result, 200
-
-    @jwt_required()
-    def post(self):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
+        next_cursor = None
+        if len(appts) > limit:
+            appts = appts[:limit]
+            next_cursor = encode_cursor(appts[-1])
 
+        return {
+            "items": dump_many(admin_appointment, appts),
+            "next_cursor": next_cursor,
+        }, 200
+
+    @admin_required
+    def post(self):
         session = get_db_session()
         data = appt_parser.parse_args()
 
@@ -122,17 +177,18 @@ class AdminAppointments(Resource):
         )
 
         session.add(appt)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return {"message": "This time slot is already booked"}, 409
 
         return {"message": "Appointment created", "id": appt.id}, 201
 
 class AdminAppointmentDetail(Resource):
 
-    @jwt_required()
+    @admin_required
     def put(self, appt_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         data = appt_parser.parse_args()
 
@@ -173,14 +229,15 @@ class AdminAppointmentDetail(Resource):
         if data["notes"] is not None:
             appt.notes = data["notes"]
 
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return {"message": "This time slot is already booked"}, 409
         return {"message": "Appointment updated"}, 200
 
-    @jwt_required()
+    @admin_required
     def delete(self, appt_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         appt = session.query(Appointment).get(appt_id)
 
@@ -194,11 +251,8 @@ class AdminAppointmentDetail(Resource):
 
 class AdminAppointmentStatus(Resource):
 
-    @jwt_required()
+    @admin_required
     def put(self, appt_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         data = reqparse.RequestParser()
         data.add_argument("status", required=True)
@@ -213,6 +267,10 @@ class AdminAppointmentStatus(Resource):
         except ValueError:
             return {"message": "Invalid status"}, 400
 
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return {"message": "This time slot is already booked"}, 409
 
         return {"message": "Status updated successfully"}, 200
@@ -1,62 +1,77 @@
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt
+from utils.auth import role_required
 from datetime import date
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import joinedload
 
 from database import get_db_session
+from cache.cache_utils import cache_generation, DOCTOR_DIRECTORY, PATIENT_DIRECTORY
+from utils.conditional import conditional, row_version
 from models import (
     User, UserRole,
     Appointment, AppointmentStatus,
     DoctorProfile, PatientProfile
 )
 
-def require_admin():
-    claims = get_jwt()
-    role = claims.get("role")
-    return role and role.upper() == "ADMIN"
+
+def dashboard_version():
+    count, newest = row_version(get_db_session().query(Appointment), Appointment)
+    return (
+        count,
+        newest,
+        cache_generation(DOCTOR_DIRECTORY),
+        cache_generation(PATIENT_DIRECTORY),
+        date.today(),
+    ), None
+
 
 class AdminDashboard(Resource):
 
-    @jwt_required()
+    @role_required("admin", message="Admin access only")
+    @conditional(dashboard_version)
     def get(self):
-        if not require_admin():
-            return {"message": "Admin access only"}, 403
-
         session = get_db_session()
 
-        total_doctors = (
-            session.query(User)
-            .filter(User.role == UserRole.DOCTOR)
-            .count()
-        )
-
-        total_patients = (
-            session.query(User)
-            .filter(User.role == UserRole.PATIENT)
-            .count()
-        )
+        today = date.today()
 
-        total_appointments = session.query(Appointment).count()
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
 
-        completed_appointments = (
-            session.query(Appointment)
-            .filter(Appointment.status == AppointmentStatus.COMPLETED)
-            .count()
-        )
+        def users_with_role(role):
+            return (
+                select(func.count(User.id))
+                .where(User.role == role)
+                .scalar_subquery()
+            )
 
-        today_appointments = (
-            session.query(Appointment)
-            .filter(Appointment.date == date.today())
-            .count()
+        pending_subq = (
+            select(func.count(DoctorProfile.id))
+            .where(DoctorProfile.is_verified == False)
+            .scalar_subquery()
         )
 
-        pending_verifications = (
-            session.query(DoctorProfile)
-            .filter(DoctorProfile.is_verified == False)
-            .count()
-        )
+        (
+            total_doctors,
+            total_patients,
+            total_appointments,
+            completed_appointments,
+            today_appointments,
+            pending_verifications,
+        ) = session.query(
+            users_with_role(UserRole.DOCTOR),
+            users_with_role(UserRole.PATIENT),
+            func.count(Appointment.id),
+            count_where(Appointment.status == AppointmentStatus.COMPLETED),
+            count_where(Appointment.date == today),
+            pending_subq,
+        ).select_from(Appointment).one()
 
         recent = (
             session.query(Appointment)
+            .options(
+                joinedload(Appointment.doctor),
+                joinedload(Appointment.patient).joinedload(PatientProfile.user),
+            )
             .order_by(Appointment.date.desc(), Appointment.time.desc())
             .limit(10)
             .all()
@@ -64,8 +79,8 @@ class AdminDashboard(Resource):
 
         recent_list = []
         for a in recent:
-            doctor = session.query(DoctorProfile).get(a.doctor_id)
-            patient = session.query(PatientProfile).get(a.patient_id)
+            doctor = a.doctor
+            patient = a.patient
 
             recent_list.append({
                 "id": a.id,
@@ -1,11 +1,11 @@
 from flask_restful import Resource, reqparse, request
-from flask_jwt_extended import jwt_required, get_jwt
+from utils.auth import admin_required
+from sqlalchemy import func
 from database import get_db_session
+from cache.cache_utils import bump_generation, DOCTOR_DIRECTORY
+from cache.revocation import revoke_user_tokens, set_user_active
 from models import DoctorProfile, User, UserRole, Specialization, DoctorAvailability
-from werkzeug.security import generate_password_hash
-
-def require_admin():
-    return get_jwt().get("role", "").upper() == "ADMIN"
+from utils.passwords import hash_password
 
 doctor_parser = reqparse.RequestParser()
 doctor_parser.add_argument("full_name", type=str)
@@ -22,11 +22,8 @@ doctor_parser.add_argument("consultation_fee", type=float)
 
 class AdminDoctors(Resource):
 
-    @jwt_required()
+    @admin_required
     def get(self):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         docs = session.query(DoctorProfile).all()
 
@@ -51,24 +48,22 @@ class AdminDoctors(Resource):
 
         return result, 200
 
-    @jwt_required()
+    @admin_required
     def post(self):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         data = doctor_parser.parse_args()
         session = get_db_session()
 
         if not data["email"] or not data["password"]:
             return {"message": "Email and password required"}, 400
 
-        if session.query(User).filter_by(email=data["email"]).first():
+        email = data["email"].strip().lower()
+        if session.query(User).filter(func.lower(User.email) == email).first():
             return {"message": "Email already exists"}, 400
 
         user = User(
             name=data["full_name"],
-            email=data["email"],
-            password=generate_password_hash(data["password"]),
+            email=email,
+            password=hash_password(data["password"]),
             role=UserRole.DOCTOR
         )
         session.add(user)
@@ -89,16 +84,14 @@ class AdminDoctors(Resource):
 
         session.add(doc)
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
 
         return {"message": "Doctor created", "id": doc.id}, 201
 
 class AdminDoctorDetail(Resource):
 
-    @jwt_required()
+    @admin_required
     def get(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         d = session.query(DoctorProfile).get(doc_id)
 
@@ -123,11 +116,8 @@ class AdminDoctorDetail(Resource):
             "documents": d.documents if hasattr(d, "documents") else None
         }, 200
 
-    @jwt_required()
+    @admin_required
     def put(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         doc = session.query(DoctorProfile).get(doc_id)
 
@@ -137,14 +127,18 @@ class AdminDoctorDetail(Resource):
         data = doctor_parser.parse_args()
 
         if data["email"]:
-            doc.user.email = data["email"]
+            email = data["email"].strip().lower()
+            existing_user = session.query(User).filter(func.lower(User.email) == email).first()
+            if existing_user and existing_user.id != doc.user_id:
+                return {"message": "Email already exists"}, 400
+            doc.user.email = email
 
         if data["full_name"]:
             doc.full_name = data["full_name"]
             doc.user.name = data["full_name"]
 
         if data["password"]:
-            doc.user.password = generate_password_hash(data["password"])
+            doc.user.password = hash_password(data["password"])
 
         for field in [
             "phone", "gender", "age", "specialization_id",
@@ -156,31 +150,31 @@ class AdminDoctorDetail(Resource):
                 setattr(doc, field, value)
 
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
+        if data["password"]:
+            revoke_user_tokens(doc.user_id)
         return {"message": "Doctor updated"}, 200
 
-    @jwt_required()
+    @admin_required
     def delete(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         doc = session.query(DoctorProfile).get(doc_id)
 
         if not doc:
             return {"message": "Not found"}, 404
 
+        user_id = doc.user_id
         session.delete(doc.user)
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
+        revoke_user_tokens(user_id)
 
         return {"message": "Doctor deleted"}, 200
 
 class AdminDoctorVerify(Resource):
 
-    @jwt_required()
+    @admin_required
     def put(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         doc = session.query(DoctorProfile).get(doc_id)
 
@@ -189,16 +183,14 @@ class AdminDoctorVerify(Resource):
 
         doc.is_verified = True
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
 
         return {"message": "Doctor verified"}, 200
 
 class AdminDoctorToggleActive(Resource):
 
-    @jwt_required()
+    @admin_required
     def put(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         doc = session.query(DoctorProfile).get(doc_id)
 
@@ -207,16 +199,16 @@ class AdminDoctorToggleActive(Resource):
 
         doc.is_active = not doc.is_active
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
+        # Tokens already issued stop working within REVOCATION_CACHE_TTL.
+        set_user_active(doc.user_id, doc.is_active and doc.user.is_active)
 
         return {"message": "Status updated", "is_active": doc.is_active}, 200
 
 class AdminDoctorAvailability(Resource):
 
-    @jwt_required()
+    @admin_required
     def get(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         doc = session.query(DoctorProfile).get(doc_id)
 
@@ -230,11 +222,8 @@ class AdminDoctorAvailability(Resource):
             "end": str(a.end),
         } for a in doc.availability], 200
 
-    @jwt_required()
+    @admin_required
     def post(self, doc_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         data = request.json
         session = get_db_session()
 
@@ -252,11 +241,8 @@ class AdminDoctorAvailability(Resource):
 
 class AdminDoctorAvailabilityDetail(Resource):
 
-    @jwt_required()
+    @admin_required
     def delete(self, doc_id, slot_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         slot = session.query(DoctorAvailability).get(slot_id)
 
@@ -1,11 +1,11 @@
 from flask_restful import Resource, reqparse
-from flask_jwt_extended import jwt_required, get_jwt
+from utils.auth import admin_required
+from sqlalchemy import func
 from database import get_db_session
+from cache.cache_utils import bump_generation, PATIENT_DIRECTORY
+from cache.revocation import revoke_user_tokens, set_user_active
 from models import User, UserRole, PatientProfile
 
-def require_admin():
-    return get_jwt().get("role", "").upper() == "ADMIN"
-
 patient_parser = reqparse.RequestParser()
 patient_parser.add_argument("name")
 patient_parser.add_argument("email")
@@ -15,11 +15,8 @@ patient_parser.add_argument("phone")
 patient_parser.add_argument("address")
 
 class AdminPatients(Resource):
-    @jwt_required()
+    @admin_required
     def get(self):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
 
         patients = (
@@ -48,11 +45,8 @@ class AdminPatients(Resource):
         return data, 200
 
 class AdminPatientDetail(Resource):
-    @jwt_required()
+    @admin_required
     def get(self, patient_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
 
         p = session.query(PatientProfile).get(patient_id)
@@ -73,11 +67,8 @@ class AdminPatientDetail(Resource):
             "address": p.address,
         }, 200
 
-    @jwt_required()
+    @admin_required
     def put(self, patient_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         p = session.query(PatientProfile).get(patient_id)
 
@@ -90,10 +81,11 @@ class AdminPatientDetail(Resource):
             p.user.name = data["name"]
 
         if data.get("email"):
-            existing_user = session.query(User).filter(User.email == data["email"]).first()
+            email = data["email"].strip().lower()
+            existing_user = session.query(User).filter(func.lower(User.email) == email).first()
             if existing_user and existing_user.id != p.user.id:
                 return {"message": "Email already exists"}, 400
-            p.user.email = data["email"]
+            p.user.email = email
 
         for field in ["age", "gender", "phone", "address"]:
             value = data.get(field)
@@ -101,32 +93,30 @@ class AdminPatientDetail(Resource):
                 setattr(p, field, value)
 
         session.commit()
+        bump_generation(PATIENT_DIRECTORY)
         return {"message": "Updated"}, 200
 
-    @jwt_required()
+    @admin_required
     def delete(self, patient_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         p = session.query(PatientProfile).get(patient_id)
         ac = session.query(User).get(p.user_id)
 
         if not p:
             return {"message": "Patient not found"}, 404
+        user_id = ac.id
         session.delete(ac)
 
         session.delete(p)
         session.commit()
+        revoke_user_tokens(user_id)
+        bump_generation(PATIENT_DIRECTORY)
 
         return {"message": "Patient deleted"}, 200
 
 class AdminPatientToggle(Resource):
-    @jwt_required()
+    @admin_required
     def put(self, patient_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
 
         p = session.query(PatientProfile).get(patient_id)
@@ -135,6 +125,8 @@ class AdminPatientToggle(Resource):
 
         p.user.is_active = not p.user.is_active
         session.commit()
+        # Tokens already issued stop working within REVOCATION_CACHE_TTL.
+        set_user_active(p.user_id, p.user.is_active)
 
         return {
             "message": "Status updated",
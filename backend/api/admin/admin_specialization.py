@@ -1,18 +1,19 @@
 from flask_restful import Resource, reqparse
-from flask_jwt_extended import jwt_required, get_jwt
+from utils.auth import admin_required, role_required
 from database import get_db_session
+from cache.cache_utils import bump_generation, cache_generation, DOCTOR_DIRECTORY
+from utils.conditional import conditional
 from models import Specialization
 
-def require_admin():
-    return get_jwt().get("role", "").upper() == "ADMIN"
-
 spec_parser = reqparse.RequestParser()
 spec_parser.add_argument("name", type=str, required=True)
 spec_parser.add_argument("description", type=str, required=False)
 
 class AdminSpecializations(Resource):
 
-    @jwt_required()
+    # Patients load it too, for the booking page's specialization filter.
+    @role_required("admin", "doctor", "patient")
+    @conditional(lambda: (cache_generation(DOCTOR_DIRECTORY), None))
     def get(self):
         session = get_db_session()
         specs = session.query(Specialization).all()
@@ -26,11 +27,8 @@ class AdminSpecializations(Resource):
             for s in specs
         ], 200
 
-    @jwt_required()
+    @admin_required
     def post(self):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         data = spec_parser.parse_args()
         session = get_db_session()
 
@@ -41,16 +39,14 @@ class AdminSpecializations(Resource):
 
         session.add(spec)
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
 
         return {"message": "Specialization created", "id": spec.id}, 201
 
 class AdminSpecializationDetail(Resource):
 
-    @jwt_required()
+    @admin_required
     def put(self, spec_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         spec = session.query(Specialization).get(spec_id)
 
@@ -63,14 +59,12 @@ class AdminSpecializationDetail(Resource):
         spec.description = data.get("description", "")
 
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
 
         return {"message": "Updated"}, 200
 
-    @jwt_required()
+    @admin_required
     def delete(self, spec_id):
-        if not require_admin():
-            return {"message": "Admin only"}, 403
-
         session = get_db_session()
         spec = session.query(Specialization).get(spec_id)
 
@@ -79,5 +73,6 @@ class AdminSpecializationDetail(Resource):
 
         session.delete(spec)
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
 
         return {"message": "Deleted"}, 200
@@ -0,0 +1,9 @@
+from flask_restful import Resource
+from utils.auth import admin_required
+from database import get_pool_stats
+
+class AdminDbPoolStats(Resource):
+
+    @admin_required
+    def get(self):
+        return get_pool_stats(), 200
@@ -1,12 +1,51 @@
+from flask import request
 from flask_restful import Resource
-import redis, json
+from utils.auth import admin_required
+
+from tasks.task_logger import decode_log_cursor, get_log, list_logs, latency_stats
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
-r = redis.Redis(host="localhost", port=6379, db=2)
 
 class TaskLogsAPI(Resource):
+
+    @admin_required
     def get(self, task_id):
-        data = r.get(task_id)
-        if not data:
+        log = get_log(task_id)
+        if not log:
             return {"message": "Task not found"}, 404
-        
-        return json.loads(data), 200
+
+        return log, 200
+
+
+class TaskLogListAPI(Resource):
+
+    @admin_required
+    def get(self):
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        before = None
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                before = decode_log_cursor(cursor)
+            except ValueError:
+                return {"message": "Invalid cursor"}, 400
+
+        items, next_cursor = list_logs(
+            task_name=request.args.get("task") or None,
+            status=(request.args.get("status") or "").upper() or None,
+            limit=limit,
+            before=before,
+        )
+
+        return {"items": items, "next_cursor": next_cursor}, 200
+
+
+class TaskLatencyStatsAPI(Resource):
+
+    @admin_required
+    def get(self):
+        return {"tasks": latency_stats(request.args.get("task") or None)}, 200
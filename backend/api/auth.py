@@ -1,8 +1,11 @@
 from flask_restful import Resource
 from flask import request
+from sqlalchemy import func
 from models import User, UserRole, PatientProfile, DoctorProfile
 from database import get_db_session
-from werkzeug.security import generate_password_hash, check_password_hash
+from cache.cache_utils import bump_generation, PATIENT_DIRECTORY
+from utils.passwords import hash_password, verify_password
+from utils.auth import profile_claims
 from flask_jwt_extended import create_access_token
 from datetime import timedelta
 
@@ -20,13 +23,13 @@ class Register(Resource):
             return {"message": f"Missing fields: {', '.join(missing)}"}, 400
 
         email = data["email"].strip().lower()
-        if session.query(User).filter_by(email=email).first():
+        if session.query(User).filter(func.lower(User.email) == email).first():
             return {"message": "Email already exists"}, 400
 
         user = User(
             name=data["name"].strip(),
             email=email,
-            password=generate_password_hash(data["password"]),
+            password=hash_password(data["password"]),
             role=UserRole.PATIENT,
         )
         session.add(user)
@@ -40,16 +43,23 @@ class Register(Resource):
             address=data["address"],
         )
         session.add(profile)
+        session.flush()
+
+        user_id = user.id
+        claims = profile_claims(user, profile)
         session.commit()
+        bump_generation(PATIENT_DIRECTORY)
 
         token = create_access_token(
-            identity=str(user.id), expires_delta=timedelta(days=7)
+            identity=str(user_id),
+            additional_claims=claims,
+            expires_delta=timedelta(days=7),
         )
 
         return {
             "message": "Patient registered successfully",
             "token": token,
-            "role": user.role.value,
+            "role": claims["role"],
         }, 201
 
 
@@ -65,12 +75,22 @@ class Login(Resource):
         if not email or not password or not requested_role:
             return {"message": "Missing fields"}, 400
 
-        user = session.query(User).filter_by(email=email).first()
+        # User and profile in one round trip; the lookup is
+        # case-insensitive and served by ix_users_email_lower.
+        row = (
+            session.query(User, DoctorProfile, PatientProfile)
+            .outerjoin(DoctorProfile, DoctorProfile.user_id == User.id)
+            .outerjoin(PatientProfile, PatientProfile.user_id == User.id)
+            .filter(func.lower(User.email) == email.strip().lower())
+            .first()
+        )
 
-        if not user:
+        if not row:
             return {"message": "User does not exist"}, 404
 
-        if not check_password_hash(user.password, password):
+        user, doctor, patient = row
+
+        if not verify_password(user, password):
             return {"message": "Incorrect password"}, 400
 
         if user.role.value != requested_role:
@@ -79,8 +99,6 @@ class Login(Resource):
             return {"message": f"Your account is not active!"}, 403
 
         if user.role == UserRole.DOCTOR:
-            doctor = session.query(DoctorProfile).filter_by(
-                user_id=user.id).first()
             if not doctor:
                 return {"message": "Doctor profile missing"}, 400
             if not doctor.is_active:
@@ -90,7 +108,7 @@ class Login(Resource):
 
         token = create_access_token(
             identity=str(user.id),
-            additional_claims={"role": user.role.value}
+            additional_claims=profile_claims(user, doctor or patient),
         )
 
         user_data = {
@@ -100,8 +118,12 @@ class Login(Resource):
             "role": user.role.value
         }
 
+        if session.dirty:
+            # verify_password upgraded the stored hash
+            session.commit()
+
         return {
             "token": token,
-            "role": user.role.value,
+            "role": user_data["role"],
             "user": user_data
         }, 200
@@ -1,30 +1,36 @@
 from flask_restful import Resource
-from flask_jwt_extended import get_jwt_identity
-from utils.auth import role_required
+from sqlalchemy.orm import contains_eager, joinedload
+from utils.auth import current_doctor_id, role_required
+from utils.serializers import dump_many, history_record
+from utils.conditional import conditional, history_version
 from models import Appointment, MedicalRecord, DoctorProfile
 from database import get_db_session
 
+
 class DoctorPatientHistoryAPI(Resource):
 
     @role_required("doctor")
+    @conditional(lambda patient_id: history_version(patient_id, current_doctor_id()))
     def get(self, patient_id):
         """
         Fetch ALL medical records for a specific patient,
         but only those belonging to THIS doctor.
         """
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor profile missing"}, 404
 
         appts = (
             session.query(Appointment)
             .join(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
+            .options(
+                contains_eager(Appointment.medical_record),
+                joinedload(Appointment.doctor).joinedload(DoctorProfile.specialization),
+            )
             .filter(
                 Appointment.patient_id == patient_id,
-                Appointment.doctor_id == doctor.id
+                Appointment.doctor_id == doctor_id
             )
             .order_by(Appointment.date.desc(), Appointment.time.desc())
             .all()
@@ -33,24 +39,4 @@ class DoctorPatientHistoryAPI(Resource):
         if not appts:
             return [], 200
 
-        records = []
-        for appt in appts:
-            r = appt.medical_record
-
-            records.append({
-                "id": r.id,
-                "doctor": {
-                    "name": doctor.full_name,
-                    "specialization": doctor.specialization.name,
-                },
-                "date": appt.date.isoformat(),
-                "time": appt.time.strftime("%H:%M"),
-                "visit_type": r.visit_type,
-                "tests": r.tests_done,
-                "diagnosis": r.diagnosis,
-                "medicines": r.medicines,
-                "prescription": r.prescription,
-                "notes": r.notes,
-            })
-
-        return records, 200
+        return dump_many(history_record, appts), 200
@@ -1,11 +1,12 @@
 from flask_restful import Resource
 from flask import request
-from flask_jwt_extended import get_jwt_identity
 from datetime import datetime, date
 
 from database import get_db_session
 from models import DoctorProfile, Appointment, AppointmentStatus, PatientProfile, MedicalRecord
-from utils.auth import role_required
+from sqlalchemy.orm import joinedload
+from utils.auth import current_doctor_id, role_required
+from utils.serializers import doctor_appointment, dump_many
 
 class DoctorAppointments(Resource):
 
@@ -18,13 +19,15 @@ class DoctorAppointments(Resource):
         - date_to: YYYY-MM-DD
         """
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor profile not found"}, 404
 
-        q = session.query(Appointment).filter(Appointment.doctor_id == doctor.id)
+        q = (
+            session.query(Appointment)
+            .options(joinedload(Appointment.patient).joinedload(PatientProfile.user))
+            .filter(Appointment.doctor_id == doctor_id)
+        )
 
         status = request.args.get("status")
         if status:
@@ -52,27 +55,7 @@ class DoctorAppointments(Resource):
                 return {"message": "Invalid date_to"}, 400
 
         q = q.order_by(Appointment.date.asc(), Appointment.time.asc())
-        appointments = q.all()
-
-        result = []
-        for a in appointments:
-            patient = session.query(PatientProfile).get(a.patient_id)
-            result.append({
-                "id": a.id,
-                "date": a.date.isoformat(),
-                "time": a.time.strftime("%H:%M"),
-                "status": a.status.value,
-                "notes": a.notes,
-                "patient": {
-                    "id": patient.id if patient else None,
-                    "name": patient.user.name if patient and patient.user else None,
-                    "age": patient.age if patient else None,
-                    "gender": patient.gender if patient else None,
-                    "phone": patient.phone if patient else "Not Available",
-                }
-            })
-
-        return result, 200
+        return dump_many(doctor_appointment, q.all()), 200
 
 
 class DoctorAppointmentDetail(Resource):
@@ -80,32 +63,15 @@ class DoctorAppointmentDetail(Resource):
     @role_required("doctor")
     def get(self, appointment_id):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor profile not found"}, 404
 
         a = session.query(Appointment).get(appointment_id)
-        if not a or a.doctor_id != doctor.id:
+        if not a or a.doctor_id != doctor_id:
             return {"message": "Appointment not found"}, 404
 
-        patient = session.query(PatientProfile).get(a.patient_id)
-
-        return {
-            "id": a.id,
-            "date": a.date.isoformat(),
-            "time": a.time.strftime("%H:%M"),
-            "status": a.status.value,
-            "notes": a.notes,
-            "patient": {
-                "id": patient.id if patient else None,
-                "name": patient.user.name if patient and patient.user else None,
-                "age": patient.age if patient else None,
-                "gender": patient.gender if patient else None,
-                "phone": patient.phone if patient else "Not Available",
-            }
-        }, 200
+        return doctor_appointment(a), 200
 
     @role_required("doctor")
     def put(self, appointment_id):
@@ -115,14 +81,12 @@ class DoctorAppointmentDetail(Resource):
         - notes
         """
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor profile not found"}, 404
 
         a = session.query(Appointment).get(appointment_id)
-        if not a or a.doctor_id != doctor.id:
+        if not a or a.doctor_id != doctor_id:
             return {"message": "Appointment not found"}, 404
 
         data = request.json or {}
@@ -1,11 +1,13 @@
 from flask_restful import Resource
 from flask import request
-from flask_jwt_extended import get_jwt_identity
 from datetime import date, datetime, timedelta, time
 
-from database import get_db_session
-from models import DoctorProfile, DoctorAvailability
-from utils.auth import role_required
+from sqlalchemy.exc import IntegrityError
+
+from database import get_db_session, commit_with_retry
+from models import DoctorProfile, DoctorAvailability, DoctorWeeklySchedule
+from utils.auth import current_doctor_id, role_required
+from utils.schedule import SLOT_TYPES, resolve_windows
 
 MORNING_START = time(8, 0)
 MORNING_END = time(12, 0)
@@ -13,6 +15,13 @@ MORNING_END = time(12, 0)
 EVENING_START = time(14, 0)
 EVENING_END = time(20, 0)
 
+MAX_BULK_SLOTS = 62
+
+CONCURRENT_UPDATE = (
+    {"message": "Availability was changed by another request; please retry"},
+    409,
+)
+
 def is_30min_step(t: time):
     return (t.minute % 30) == 0
 
@@ -33,116 +42,333 @@ def check_within_window(slot_type, start, end):
     else:
         return EVENING_START <= start <= EVENING_END and EVENING_START <= end <= EVENING_END
 
+def parse_slot(data):
+    """
+    Validate one availability entry.
+    Returns (date, slot_type, is_available, start, end) or raises ValueError.
+    """
+    for r in ("date", "slot_type"):
+        if r not in data:
+            raise ValueError(f"{r} is required")
+
+    try:
+        slot_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format")
+
+    slot_type = str(data["slot_type"]).lower()
+    if slot_type not in SLOT_TYPES:
+        raise ValueError("Invalid slot_type")
+
+    return (slot_date, slot_type) + parse_window(slot_type, data)
+
+def parse_window(slot_type, data):
+    """
+    Validate the availability flag and times of one entry.
+    Returns (is_available, start, end) or raises ValueError.
+    """
+    is_available = bool(data.get("is_available", False))
+    if not is_available:
+        return False, None, None
+
+    try:
+        start = datetime.strptime(data["start_time"], "%H:%M").time()
+        end = datetime.strptime(data["end_time"], "%H:%M").time()
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid start/end time")
+
+    if not (is_30min_step(start) and is_30min_step(end)):
+        raise ValueError("Time must be in 30-minute intervals")
+
+    if start >= end:
+        raise ValueError("start_time must be before end_time")
+
+    if not check_within_window(slot_type, start, end):
+        raise ValueError(f"{slot_type} slot must be inside allowed window")
+
+    return True, start, end
+
+def apply_slot(slot, is_available, start, end):
+    slot.is_available = is_available
+    slot.start_time = start
+    slot.end_time = end
+
 class DoctorAvailabilityList(Resource):
 
     @role_required("doctor")
     def get(self):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor not found"}, 404
 
         today = date.today()
         days = [today + timedelta(days=i) for i in range(8)]
 
+        slot_map = {
+            (w.date, w.slot_type): w
+            for w in resolve_windows(session, [doctor_id], days[0], days[-1])
+        }
+
+        def serialize(d, slot_type):
+            slot = slot_map.get((d, slot_type))
+
+            start_time = slot.start_time if slot else None
+            end_time = slot.end_time if slot else None
+
+            return {
+                "id": slot.id if slot else None,
+                "slot_type": slot_type,
+                "source": slot.source if slot else None,
+                "is_available": slot.is_available if slot else False,
+                "start_time": start_time.strftime("%H:%M") if start_time else None,
+                "end_time": end_time.strftime("%H:%M") if end_time else None,
+                "timeslots": (
+                    generate_30min_slots(start_time, end_time)
+                    if slot and slot.is_available and start_time and end_time
+                    else []
+                )
+            }
+
         response = []
 
         for d in days:
-            slots = session.query(DoctorAvailability).filter_by(
-                doctor_id=doctor.id, date=d
-            ).all()
+            response.append({
+                "date": d.isoformat(),
+                "morning": serialize(d, "morning"),
+                "evening": serialize(d, "evening"),
+            })
 
-            slot_map = {s.slot_type: s for s in slots}
+        return response, 200
 
-            def serialize(slot_type):
-                slot = slot_map.get(slot_type)
+    @role_required("doctor")
+    def post(self):
+        session = get_db_session()
+        data = request.json or {}
 
-                start_time = slot.start_time if slot else None
-                end_time = slot.end_time if slot else None
+        try:
+            slot_date, slot_type, is_available, start, end = parse_slot(data)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        doctor_id = current_doctor_id()
+        if not doctor_id:
+            return {"message": "Doctor profile not found"}, 404
+
+        def upsert(session):
+            slot = session.query(DoctorAvailability).filter_by(
+                doctor_id=doctor_id, date=slot_date, slot_type=slot_type
+            ).first()
+
+            if not slot:
+                slot = DoctorAvailability(
+                    doctor_id=doctor_id,
+                    date=slot_date,
+                    slot_type=slot_type
+                )
+                session.add(slot)
+
+            apply_slot(slot, is_available, start, end)
+
+        # uq_doctor_availability_doctor_date_slot catches a concurrent insert
+        try:
+            commit_with_retry(session, upsert)
+        except IntegrityError:
+            return CONCURRENT_UPDATE
 
-                return {
-                    "id": slot.id if slot else None,
-                    "slot_type": slot_type,
-                    "is_available": slot.is_available if slot else False,
-                    "start_time": start_time.strftime("%H:%M") if start_time else None,
-                    "end_time": end_time.strftime("%H:%M") if end_time else None,
-                    "timeslots": (
-                        generate_30min_slots(start_time, end_time)
-                        if slot and slot.is_available and start_time and end_time
-                        else []
-                    )
-                }
+        return {"message": "Availability updated"}, 200
 
-            response.append({
-                "date": d.isoformat(),
-                "morning": serialize("morning"),
-                "evening": serialize("evening"),
-            })
 
-        return response, 200
+class DoctorAvailabilityBulk(Resource):
 
     @role_required("doctor")
     def post(self):
+        """
+        Body JSON:
+        {
+            "slots": [
+                {"date": "YYYY-MM-DD", "slot_type": "morning" | "evening",
+                 "is_available": bool, "start_time": "HH:MM", "end_time": "HH:MM"},
+                ...
+            ]
+        }
+        Every entry is validated before anything is written; the whole
+        batch is upserted in one transaction. When several entries share a
+        date and slot_type the last one wins; the others are listed under
+        "dropped" in the response.
+        """
         session = get_db_session()
         data = request.json or {}
 
-        required = ["date", "slot_type"]
-        for r in required:
-            if r not in data:
-                return {"message": f"{r} is required"}, 400
+        entries = data.get("slots")
+        if not isinstance(entries, list) or not entries:
+            return {"message": "slots must be a non-empty list"}, 400
+
+        if len(entries) > MAX_BULK_SLOTS:
+            return {"message": f"At most {MAX_BULK_SLOTS} slots per request"}, 400
 
+        parsed = {}
+        positions = {}
+        dropped = []
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                return {"message": f"slots[{i}]: invalid entry"}, 400
+            try:
+                slot_date, slot_type, is_available, start, end = parse_slot(entry)
+            except ValueError as e:
+                return {"message": f"slots[{i}]: {e}"}, 400
+
+            key = (slot_date, slot_type)
+            if key in positions:
+                dropped.append({
+                    "index": positions[key],
+                    "date": slot_date.isoformat(),
+                    "slot_type": slot_type,
+                })
+            positions[key] = i
+            parsed[key] = (is_available, start, end)
+
+        doctor_id = current_doctor_id()
+        if not doctor_id:
+            return {"message": "Doctor not found"}, 404
+
+        dates = [d for d, _ in parsed]
+
+        def upsert(session):
+            existing = {
+                (s.date, s.slot_type): s
+                for s in session.query(DoctorAvailability)
+                .filter(DoctorAvailability.doctor_id == doctor_id)
+                .filter(DoctorAvailability.date >= min(dates))
+                .filter(DoctorAvailability.date <= max(dates))
+                .all()
+            }
+
+            created = 0
+            for (slot_date, slot_type), (is_available, start, end) in parsed.items():
+                slot = existing.get((slot_date, slot_type))
+                if not slot:
+                    slot = DoctorAvailability(
+                        doctor_id=doctor_id,
+                        date=slot_date,
+                        slot_type=slot_type
+                    )
+                    session.add(slot)
+                    created += 1
+
+                apply_slot(slot, is_available, start, end)
+
+            return created
+
+        # uq_doctor_availability_doctor_date_slot catches a concurrent insert
         try:
-            slot_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
-        except:
-            return {"message": "Invalid date format"}, 400
+            created = commit_with_retry(session, upsert)
+        except IntegrityError:
+            return CONCURRENT_UPDATE
+
+        return {
+            "message": "Availability updated",
+            "created": created,
+            "updated": len(parsed) - created,
+            "dropped": sorted(dropped, key=lambda d: d["index"]),
+        }, 200
+
+
+class DoctorWeeklyScheduleAPI(Resource):
+
+    @role_required("doctor")
+    def get(self):
+        session = get_db_session()
+        doctor_id = current_doctor_id()
+        if not doctor_id:
+            return {"message": "Doctor not found"}, 404
+
+        rows = {
+            (t.weekday, t.slot_type): t
+            for t in session.query(DoctorWeeklySchedule).filter_by(doctor_id=doctor_id)
+        }
+
+        def serialize(weekday, slot_type):
+            t = rows.get((weekday, slot_type))
+            return {
+                "id": t.id if t else None,
+                "slot_type": slot_type,
+                "is_available": bool(t.is_available) if t else False,
+                "start_time": t.start_time.strftime("%H:%M") if t and t.start_time else None,
+                "end_time": t.end_time.strftime("%H:%M") if t and t.end_time else None,
+            }
+
+        return [
+            {
+                "weekday": weekday,
+                "morning": serialize(weekday, "morning"),
+                "evening": serialize(weekday, "evening"),
+            }
+            for weekday in range(7)
+        ], 200
 
-        slot_type = data["slot_type"].lower()
-        if slot_type not in ("morning", "evening"):
-            return {"message": "Invalid slot_type"}, 400
+    @role_required("doctor")
+    def put(self):
+        """
+        Body JSON:
+        {
+            "schedule": [
+                {"weekday": 0-6 (Monday == 0), "slot_type": "morning" | "evening",
+                 "is_available": bool, "start_time": "HH:MM", "end_time": "HH:MM"},
+                ...
+            ]
+        }
+        Entries are upserted; weekdays/slot_types not listed are left alone.
+        Per-date availability rows keep overriding the weekly schedule.
+        """
+        session = get_db_session()
+        data = request.json or {}
 
-        user_id = int(get_jwt_identity())
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
+        entries = data.get("schedule")
+        if not isinstance(entries, list) or not entries:
+            return {"message": "schedule must be a non-empty list"}, 400
 
-        slot = session.query(DoctorAvailability).filter_by(
-            doctor_id=doctor.id, date=slot_date, slot_type=slot_type
-        ).first()
+        parsed = {}
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                return {"message": f"schedule[{i}]: invalid entry"}, 400
 
-        if not slot:
-            slot = DoctorAvailability(
-                doctor_id=doctor.id,
-                date=slot_date,
-                slot_type=slot_type
-            )
-            session.add(slot)
+            weekday = entry.get("weekday")
+            if not isinstance(weekday, int) or not 0 <= weekday <= 6:
+                return {"message": f"schedule[{i}]: weekday must be 0-6"}, 400
 
-        slot.is_available = bool(data.get("is_available", False))
+            slot_type = str(entry.get("slot_type", "")).lower()
+            if slot_type not in SLOT_TYPES:
+                return {"message": f"schedule[{i}]: Invalid slot_type"}, 400
 
-        if slot.is_available:
             try:
-                start = datetime.strptime(data["start_time"], "%H:%M").time()
-                end = datetime.strptime(data["end_time"], "%H:%M").time()
-            except:
-                return {"message": "Invalid start/end time"}, 400
+                parsed[(weekday, slot_type)] = parse_window(slot_type, entry)
+            except ValueError as e:
+                return {"message": f"schedule[{i}]: {e}"}, 400
 
-            if not (is_30min_step(start) and is_30min_step(end)):
-                return {"message": "Time must be in 30-minute intervals"}, 400
+        doctor_id = current_doctor_id()
+        if not doctor_id:
+            return {"message": "Doctor not found"}, 404
 
-            if start >= end:
-                return {"message": "start_time must be before end_time"}, 400
+        existing = {
+            (t.weekday, t.slot_type): t
+            for t in session.query(DoctorWeeklySchedule).filter_by(doctor_id=doctor_id)
+        }
 
-            if not check_within_window(slot_type, start, end):
-                return {"message": f"{slot_type} slot must be inside allowed window"}, 400
+        for (weekday, slot_type), (is_available, start, end) in parsed.items():
+            row = existing.get((weekday, slot_type))
+            if not row:
+                row = DoctorWeeklySchedule(
+                    doctor_id=doctor_id,
+                    weekday=weekday,
+                    slot_type=slot_type
+                )
+                session.add(row)
 
-            slot.start_time = start
-            slot.end_time = end
-        else:
-            slot.start_time = None
-            slot.end_time = None
+            apply_slot(row, is_available, start, end)
 
         session.commit()
-        return {"message": "Availability updated"}, 200
+        return {"message": "Weekly schedule updated"}, 200
 
 
 class DoctorAvailabilityDetail(Resource):
@@ -152,19 +378,26 @@ class DoctorAvailabilityDetail(Resource):
         session = get_db_session()
 
         slot = session.query(DoctorAvailability).get(slot_id)
-        if not slot:
+        if not slot or slot.doctor_id != current_doctor_id():
             return {"message": "Availability slot not found"}, 404
 
         data = request.json or {}
 
-        if "is_available" in data:
-            slot.is_available = bool(data["is_available"])
-
-        if "start_time" in data:
-            slot.start_time = datetime.strptime(data["start_time"], "%H:%M").time()
+        # Validate the slot as it will be after the update, not just the
+        # fields sent, so a lone end_time cannot cross the stored start.
+        merged_data = {
+            "is_available": slot.is_available,
+            "start_time": slot.start_time.strftime("%H:%M") if slot.start_time else None,
+            "end_time": slot.end_time.strftime("%H:%M") if slot.end_time else None,
+        }
+        merged_data.update(
+            (k, data[k]) for k in ("is_available", "start_time", "end_time") if k in data
+        )
 
-        if "end_time" in data:
-            slot.end_time = datetime.strptime(data["end_time"], "%H:%M").time()
+        try:
+            apply_slot(slot, *parse_window(slot.slot_type, merged_data))
+        except ValueError as e:
+            return {"message": str(e)}, 400
 
         session.commit()
         return {"message": "Slot updated"}, 200
@@ -174,7 +407,7 @@ class DoctorAvailabilityDetail(Resource):
         session = get_db_session()
 
         slot = session.query(DoctorAvailability).get(slot_id)
-        if not slot:
+        if not slot or slot.doctor_id != current_doctor_id():
             return {"message": "Availability slot not found"}, 404
 
         session.delete(slot)
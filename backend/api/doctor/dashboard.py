@@ -1,26 +1,64 @@
+from flask import g
 from flask_restful import Resource
-from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.orm import joinedload
 from datetime import date
 
 from database import get_db_session
+from cache.cache_utils import cache_generation, DOCTOR_DIRECTORY, PATIENT_DIRECTORY
+from utils.conditional import conditional, row_version
 from models import (
     DoctorProfile,
     Appointment,
     AppointmentStatus,
     PatientProfile,
-    DoctorAvailability,
 )
-from utils.auth import role_required
+from utils.auth import current_doctor, current_doctor_id, role_required
+from utils.schedule import open_windows
+
+
+def today_windows(session, doctor_id):
+    """
+    The doctor's open windows for today, resolved once per request and
+    cached on `flask.g`: the validator and the handler both need them.
+    """
+    if "doctor_today_windows" not in g:
+        today = date.today()
+        g.doctor_today_windows = open_windows(session, [doctor_id], today, today)
+    return g.doctor_today_windows
+
+
+def dashboard_version():
+    session = get_db_session()
+    doctor_id = current_doctor_id()
+
+    count, newest = row_version(
+        session.query(Appointment).filter(Appointment.doctor_id == doctor_id),
+        Appointment,
+    )
+    # Availability rows carry no timestamps; today's windows are few, so
+    # they go into the version as they are.
+    windows = [
+        (w.id, w.slot_type, w.start_time, w.end_time)
+        for w in today_windows(session, doctor_id)
+    ]
+    return (
+        count,
+        newest,
+        windows,
+        cache_generation(DOCTOR_DIRECTORY),
+        cache_generation(PATIENT_DIRECTORY),
+        date.today(),
+    ), None
+
 
 class DoctorDashboard(Resource):
 
     @role_required("doctor")
+    @conditional(dashboard_version)
     def get(self):
         session = get_db_session()
 
-        user_id = int(get_jwt_identity())
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-
+        doctor = current_doctor()
         if not doctor:
             return {"message": "Doctor profile not found"}, 404
 
@@ -43,13 +81,7 @@ class DoctorDashboard(Resource):
         today = date.today()
 
         today_slots = []
-        today_availability = (
-            session.query(DoctorAvailability)
-            .filter(DoctorAvailability.doctor_id == doctor.id)
-            .filter(DoctorAvailability.date == today)
-            .filter(DoctorAvailability.is_available.is_(True))
-            .all()
-        )
+        today_availability = today_windows(session, doctor.id)
 
         for slot in today_availability:
             today_slots.append({
@@ -62,6 +94,7 @@ class DoctorDashboard(Resource):
 
         next_upcoming = (
             session.query(Appointment)
+            .options(joinedload(Appointment.patient).joinedload(PatientProfile.user))
             .filter(Appointment.doctor_id == doctor.id)
             .filter(Appointment.date >= today)
             .filter(Appointment.status != AppointmentStatus.CANCELLED)
@@ -73,7 +106,7 @@ class DoctorDashboard(Resource):
 
         upcoming_list = []
         for a in next_upcoming:
-            patient = session.query(PatientProfile).get(a.patient_id)
+            patient = a.patient
             upcoming_list.append({
                 "id": a.id,
                 "date": a.date.isoformat(),
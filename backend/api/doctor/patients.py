@@ -1,58 +1,131 @@
 from flask_restful import Resource
-from flask_jwt_extended import get_jwt_identity
+from flask import request
 from datetime import date
 
+from sqlalchemy import and_, case, func, or_, select
+
 from database import get_db_session
-from models import DoctorProfile, Appointment, PatientProfile
-from utils.auth import role_required
+from models import DoctorProfile, Appointment, AppointmentStatus, PatientProfile, User
+from utils.auth import current_doctor_id, role_required
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
 
 class DoctorPatients(Resource):
 
     @role_required("doctor")
     def get(self):
+        """
+        Optional query params:
+        - search: matches patient name or phone
+        - page: 1-based page number
+        - per_page: page size (default 25, max 100)
+        """
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor profile not found"}, 404
 
-        patient_ids = (
-            session.query(Appointment.patient_id)
-            .filter(Appointment.doctor_id == doctor.id)
-            .distinct()
-            .all()
+        today = date.today()
+        # Past and today's non-cancelled appointments count as visits.
+        visited = and_(
+            Appointment.status != AppointmentStatus.CANCELLED,
+            Appointment.date <= today,
         )
-        patient_ids = [pid for (pid,) in patient_ids]
 
-        if not patient_ids:
-            return [], 200
+        visits = (
+            select(
+                Appointment.patient_id.label("patient_id"),
+                func.max(case((visited, Appointment.date))).label("last_visit_date"),
+                func.count(case((visited, Appointment.id))).label("visit_count"),
+            )
+            .where(Appointment.doctor_id == doctor_id)
+            .group_by(Appointment.patient_id)
+            .subquery()
+        )
 
-        patients = (
-            session.query(PatientProfile)
-            .filter(PatientProfile.id.in_(patient_ids))
-            .all()
+        upcoming = (
+            select(
+                Appointment.patient_id.label("patient_id"),
+                Appointment.id.label("id"),
+                Appointment.date.label("date"),
+                Appointment.time.label("time"),
+                func.row_number().over(
+                    partition_by=Appointment.patient_id,
+                    order_by=(Appointment.date.asc(), Appointment.time.asc()),
+                ).label("rn"),
+            )
+            .where(Appointment.doctor_id == doctor_id)
+            .where(Appointment.date >= today)
+            .where(Appointment.status.in_(
+                (AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED)
+            ))
+            .subquery()
         )
 
-        last_visits = {
-            pid: session.query(Appointment)
-                .filter(Appointment.doctor_id == doctor.id, Appointment.patient_id == pid)
-                .order_by(Appointment.date.desc(), Appointment.time.desc())
-                .first()
-            for pid in patient_ids
-        }
+        q = (
+            session.query(
+                PatientProfile,
+                User.name,
+                User.email,
+                visits.c.last_visit_date,
+                visits.c.visit_count,
+                upcoming.c.id,
+                upcoming.c.date,
+                upcoming.c.time,
+            )
+            .join(visits, visits.c.patient_id == PatientProfile.id)
+            .join(User, PatientProfile.user_id == User.id)
+            .outerjoin(
+                upcoming,
+                and_(upcoming.c.patient_id == PatientProfile.id, upcoming.c.rn == 1),
+            )
+        )
+
+        search = request.args.get("search", "", type=str).strip()
+        if search:
+            like = f"%{search.lower()}%"
+            q = q.filter(
+                or_(
+                    func.lower(User.name).like(like),
+                    PatientProfile.phone.like(like),
+                )
+            )
+
+        page = max(request.args.get("page", 1, type=int), 1)
+        per_page = request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int)
+        per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+
+        total = q.order_by(None).count()
+
+        rows = (
+            q.order_by(User.name.asc(), PatientProfile.id.asc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
 
         result = []
-        for p in patients:
-            lv = last_visits.get(p.id)
+        for p, name, email, last_visit, visit_count, next_id, next_date, next_time in rows:
             result.append({
                 "id": p.id,
-                "name": p.user.name if p.user else None,
-                "email": p.user.email if p.user else None,
+                "name": name,
+                "email": email,
                 "age": p.age,
                 "gender": p.gender,
                 "phone": p.phone,
-                "last_visit_date": lv.date.isoformat() if lv else None,
+                "last_visit_date": last_visit.isoformat() if last_visit else None,
+                "visit_count": visit_count,
+                "next_appointment": {
+                    "id": next_id,
+                    "date": next_date.isoformat(),
+                    "time": next_time.strftime("%H:%M"),
+                } if next_id else None,
             })
 
-        return result, 200
+        return {
+            "items": result,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+        }, 200
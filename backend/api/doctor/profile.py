@@ -1,9 +1,9 @@
 from flask_restful import Resource, reqparse
-from flask_jwt_extended import get_jwt_identity
 
 from database import get_db_session
+from cache.cache_utils import bump_generation, DOCTOR_DIRECTORY
 from models import DoctorProfile, User
-from utils.auth import role_required
+from utils.auth import current_doctor, role_required
 
 profile_parser = reqparse.RequestParser()
 profile_parser.add_argument("full_name")
@@ -19,9 +19,7 @@ class DoctorProfileMe(Resource):
     @role_required("doctor")
     def get(self):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doc = session.query(DoctorProfile).filter_by(user_id=user_id).first()
+        doc = current_doctor()
         if not doc:
             return {"message": "Doctor profile not found"}, 404
 
@@ -48,9 +46,7 @@ class DoctorProfileMe(Resource):
     @role_required("doctor")
     def put(self):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doc = session.query(DoctorProfile).filter_by(user_id=user_id).first()
+        doc = current_doctor()
         if not doc:
             return {"message": "Doctor profile not found"}, 404
 
@@ -66,5 +62,6 @@ class DoctorProfileMe(Resource):
                 setattr(doc, field, value)
 
         session.commit()
+        bump_generation(DOCTOR_DIRECTORY)
 
         return {"message": "Profile updated"}, 200
@@ -1,7 +1,6 @@
 from flask_restful import Resource
 from flask import request
-from utils.auth import role_required
-from flask_jwt_extended import get_jwt_identity
+from utils.auth import current_doctor_id, role_required
 
 from models import Appointment, MedicalRecord, PatientProfile, DoctorProfile
 from database import get_db_session
@@ -12,10 +11,8 @@ class DoctorMedicalRecordAPI(Resource):
     @role_required("doctor")
     def post(self):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
-        if not doctor:
+        doctor_id = current_doctor_id()
+        if not doctor_id:
             return {"message": "Doctor profile missing"}, 404
 
         data = request.json or {}
@@ -25,7 +22,7 @@ class DoctorMedicalRecordAPI(Resource):
             return {"message": "appointment_id is required"}, 400
 
         appointment = session.query(Appointment).get(appointment_id)
-        if not appointment or appointment.doctor_id != doctor.id:
+        if not appointment or appointment.doctor_id != doctor_id:
             return {"message": "Appointment not found"}, 404
 
         record = appointment.medical_record
@@ -53,13 +50,13 @@ class DoctorMedicalRecordAPI(Resource):
     @role_required("doctor")
     def get(self, appointment_id):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        doctor = session.query(DoctorProfile).filter_by(user_id=user_id).first()
+        doctor_id = current_doctor_id()
+        if not doctor_id:
+            return {"message": "Doctor profile missing"}, 404
 
         appt = (
             session.query(Appointment)
-            .filter_by(id=appointment_id, doctor_id=doctor.id)
+            .filter_by(id=appointment_id, doctor_id=doctor_id)
             .first()
         )
 
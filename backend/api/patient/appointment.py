@@ -2,75 +2,132 @@
 
 from flask_restful import Resource
 from flask import request
-from flask_jwt_extended import get_jwt_identity
 
 from datetime import datetime, date, timedelta
 
 
-from database import get_db_session
+from database import get_db_session, commit_with_retry
 from models import (
     User,
     DoctorProfile,
     Specialization,
-    DoctorAvailability,
     Appointment,
     AppointmentStatus,
     PatientProfile,
 )
-from utils.auth import role_required
+from utils.auth import current_patient_id, role_required
 
 from sqlalchemy import or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, contains_eager
+
+from cache.cache_utils import (
+    DOCTOR_DIRECTORY,
+    cache_generation,
+    cache_get_or_set,
+    versioned_key,
+)
+from utils.conditional import conditional
+from utils.doctor_search import build_match_query, ranked_matches
+from utils.schedule import open_windows
+from utils.serializers import dump_many, patient_appointment, patient_appointment_detail
+from utils.slot_engine import free_slots, earliest_free_slots, SLOT_MINUTES
+
+# How far ahead patients can see and book slots.
+BOOKING_HORIZON_DAYS = 7
+
+EARLIEST_DEFAULT_DAYS = 14
+EARLIEST_MAX_DAYS = 30
+EARLIEST_DEFAULT_LIMIT = 5
+EARLIEST_MAX_LIMIT = 50
+
+
+DOCTOR_SORTS = {
+    "fees_low": DoctorProfile.consultation_fee.asc(),
+    "fees_high": DoctorProfile.consultation_fee.desc(),
+    "exp_high": DoctorProfile.experience_years.desc(),
+    "exp_low": DoctorProfile.experience_years.asc(),
+}
+
+
+def doctor_list_params():
+    """
+    The doctor listing's query parameters, normalized. The cache key and
+    the ETag are both built from these, so reordered or unknown
+    parameters map to the same entry.
+    """
+    search = " ".join(request.args.get("search", "", type=str).lower().split())
+    specialization_id = request.args.get("specialization", type=int)
+    sort = request.args.get("sort", "", type=str)
+
+    return {
+        "search": search,
+        "specialization": specialization_id or "",
+        "sort": sort if sort in DOCTOR_SORTS else "",
+    }
+
+
+def directory_version(doctor_id=None):
+    """Doctor listings only change when the directory generation is bumped."""
+    return (cache_generation(DOCTOR_DIRECTORY), doctor_id), None
 
-from cache.cache_utils import cache_get, cache_set
+
+def doctor_list_version():
+    generation = cache_generation(DOCTOR_DIRECTORY)
+    return (generation, sorted(doctor_list_params().items())), None
 
 
 class PatientDoctorListAPI(Resource):
 
     @role_required("patient")
+    @conditional(doctor_list_version)
     def get(self):
-        session = get_db_session()
+        params = doctor_list_params()
 
-        search = request.args.get("search", "", type=str).strip()
-        specialization_id = request.args.get("specialization", type=int)
-        sort = request.args.get("sort", "", type=str)
+        result = cache_get_or_set(
+            versioned_key(DOCTOR_DIRECTORY, params),
+            lambda: self.load(**params),
+            ttl=60,
+        )
 
-        use_cache = (not search) and (not specialization_id) and (not sort)
-        cache_key = "patient:doctors:all"
+        return result, 200
 
-        if use_cache:
-            cached = cache_get(cache_key)
-            if cached is not None:
-                return cached, 200
+    def load(self, search, specialization, sort):
+        session = get_db_session()
 
         q = (
             session.query(DoctorProfile)
             .join(User, DoctorProfile.user_id == User.id)
             .outerjoin(Specialization, DoctorProfile.specialization_id == Specialization.id)
+            .options(contains_eager(DoctorProfile.specialization))
             .filter(DoctorProfile.is_active.is_(True))
             .filter(DoctorProfile.is_verified.is_(True))
         )
 
+        hits = None
         if search:
-            like = f"%{search.lower()}%"
-            q = q.filter(
-                or_(
-                    func.lower(DoctorProfile.full_name).like(like),
-                    func.lower(User.name).like(like),
-                    func.lower(Specialization.name).like(like),
+            match = build_match_query(search)
+            if match and session.get_bind().dialect.name == "sqlite":
+                hits = ranked_matches(match)
+                q = q.join(hits, hits.c.doctor_id == DoctorProfile.id)
+            else:
+                like = f"%{search}%"
+                q = q.filter(
+                    or_(
+                        func.lower(DoctorProfile.full_name).like(like),
+                        func.lower(User.name).like(like),
+                        func.lower(Specialization.name).like(like),
+                    )
                 )
-            )
 
-        if specialization_id:
-            q = q.filter(DoctorProfile.specialization_id == specialization_id)
+        if specialization:
+            q = q.filter(DoctorProfile.specialization_id == specialization)
+
+        if sort:
+            q = q.order_by(DOCTOR_SORTS[sort])
 
-        if sort == "fees_low":
-            q = q.order_by(DoctorProfile.consultation_fee.asc())
-        elif sort == "fees_high":
-            q = q.order_by(DoctorProfile.consultation_fee.desc())
-        elif sort == "exp_high":
-            q = q.order_by(DoctorProfile.experience_years.desc())
-        elif sort == "exp_low":
-            q = q.order_by(DoctorProfile.experience_years.asc())
+        if hits is not None:
+            q = q.order_by(hits.c.rank.asc())
 
         doctors = q.all()
 
@@ -86,15 +143,13 @@ class PatientDoctorListAPI(Resource):
                 "photo": getattr(d, "photo_url", None),
             })
 
-        if use_cache:
-            cache_set(cache_key, result, ttl=60)
-
-        return result, 200
+        return result
 
 
 class PatientDoctorDetailAPI(Resource):
 
     @role_required("patient")
+    @conditional(directory_version)
     def get(self, doctor_id):
         session = get_db_session()
 
@@ -138,42 +193,80 @@ class PatientDoctorAvailabilityAPI(Resource):
             return {"message": "Doctor not found or not available"}, 404
 
         today = date.today()
-        end_date = today + timedelta(days=7)
-
-        avail_rows = (
-            session.query(DoctorAvailability)
-            .filter(DoctorAvailability.doctor_id == doctor_id)
-            .filter(DoctorAvailability.date >= today)
-            .filter(DoctorAvailability.date <= end_date)
-            .filter(DoctorAvailability.is_available.is_(True))
-            .all()
-        )
+        end_date = today + timedelta(days=BOOKING_HORIZON_DAYS)
+
+        slots = [
+            {
+                "id": slot["id"],
+                "date": slot["date"].isoformat(),
+                "time": slot["time"].strftime("%H:%M"),
+                "slot_type": slot["slot_type"],
+            }
+            for slot in free_slots(session, doctor_id, today, end_date)
+        ]
 
-        slots = []
+        return slots, 200
 
-        for row in avail_rows:
-            if not row.start_time:
-                continue
 
-            conflict = (
-                session.query(Appointment)
-                .filter(Appointment.doctor_id == doctor_id)
-                .filter(Appointment.date == row.date)
-                .filter(Appointment.time == row.start_time)
-                .filter(Appointment.status != AppointmentStatus.CANCELLED)
-                .first()
-            )
+class PatientEarliestSlotsAPI(Resource):
 
-            if conflict:
-                continue
+    @role_required("patient")
+    def get(self):
+        """
+        Query params:
+        - specialization: specialization id (required)
+        - max_fee: consultation fee ceiling
+        - days: search horizon from today (default 14, max 30)
+        - limit: number of slots to return (default 5, max 50)
+        """
+        session = get_db_session()
 
-            slots.append({
-                "id": row.id,
-                "date": row.date.isoformat(),
-                "time": row.start_time.strftime("%H:%M"),
+        specialization_id = request.args.get("specialization", type=int)
+        if not specialization_id:
+            return {"message": "specialization is required"}, 400
+
+        max_fee = request.args.get("max_fee", type=float)
+
+        days = request.args.get("days", EARLIEST_DEFAULT_DAYS, type=int)
+        days = max(0, min(days, EARLIEST_MAX_DAYS))
+
+        limit = request.args.get("limit", EARLIEST_DEFAULT_LIMIT, type=int)
+        limit = max(1, min(limit, EARLIEST_MAX_LIMIT))
+
+        q = (
+            session.query(DoctorProfile)
+            .options(joinedload(DoctorProfile.specialization))
+            .filter(DoctorProfile.specialization_id == specialization_id)
+            .filter(DoctorProfile.is_active.is_(True))
+            .filter(DoctorProfile.is_verified.is_(True))
+        )
+
+        if max_fee is not None:
+            q = q.filter(func.coalesce(DoctorProfile.consultation_fee, 0) <= max_fee)
+
+        doctors = {d.id: d for d in q.all()}
+
+        today = date.today()
+        slots = earliest_free_slots(
+            session, list(doctors), today, today + timedelta(days=days), limit
+        )
+
+        result = []
+        for slot in slots:
+            d = doctors[slot["doctor_id"]]
+            result.append({
+                "doctor": {
+                    "id": d.id,
+                    "name": d.full_name,
+                    "specialization": d.specialization.name if d.specialization else None,
+                    "fees": d.consultation_fee or 0.0,
+                },
+                "date": slot["date"].isoformat(),
+                "time": slot["time"].strftime("%H:%M"),
+                "slot_type": slot["slot_type"],
             })
 
-        return slots, 200
+        return result, 200
 
 
 class PatientAppointmentsAPI(Resource):
@@ -189,11 +282,8 @@ class PatientAppointmentsAPI(Resource):
         }
         """
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
-        if not patient:
+        patient_id = current_patient_id()
+        if not patient_id:
             return {"message": "Patient profile not found"}, 404
 
         data = request.json or {}
@@ -211,17 +301,29 @@ class PatientAppointmentsAPI(Resource):
         except ValueError:
             return {"message": "Invalid date or time format"}, 400
 
+        # Weekly templates open every matching weekday, so the window
+        # listed by PatientDoctorAvailabilityAPI is enforced here too.
+        now = datetime.now()
+        if datetime.combine(date_obj, time_obj) <= now:
+            return {"message": "Selected time is in the past"}, 400
+        if date_obj > now.date() + timedelta(days=BOOKING_HORIZON_DAYS):
+            return {
+                "message": f"Appointments can be booked at most {BOOKING_HORIZON_DAYS} days ahead"
+            }, 400
+
         doctor = session.query(DoctorProfile).get(doctor_id)
         if not doctor or not doctor.is_active or not doctor.is_verified:
             return {"message": "Doctor not found or not available"}, 404
 
-        avail = (
-            session.query(DoctorAvailability)
-            .filter_by(doctor_id=doctor_id, date=date_obj)
-            .filter(DoctorAvailability.is_available.is_(True))
-            .filter(DoctorAvailability.start_time == time_obj)
-            .first()
-        )
+        avail = None
+        if time_obj.minute % SLOT_MINUTES == 0:
+            avail = next(
+                (
+                    w for w in open_windows(session, [doctor.id], date_obj, date_obj)
+                    if w.start_time <= time_obj < w.end_time
+                ),
+                None,
+            )
 
         if not avail:
             return {"message": "Selected time is not available"}, 400
@@ -235,51 +337,43 @@ class PatientAppointmentsAPI(Resource):
         if conflict:
             return {"message": "This time slot is already booked"}, 409
 
-        appt = Appointment(
-            patient_id=patient.id,
-            doctor_id=doctor_id,
-            date=date_obj,
-            time=time_obj,
-            status=AppointmentStatus.PENDING,
-        )
-        session.add(appt)
-        session.commit()
+        def book(session):
+            appt = Appointment(
+                patient_id=patient_id,
+                doctor_id=doctor_id,
+                date=date_obj,
+                time=time_obj,
+                status=AppointmentStatus.PENDING,
+            )
+            session.add(appt)
+            return appt
+
+        # uq_appointments_active_slot settles races the check above can't see
+        try:
+            appt = commit_with_retry(session, book)
+        except IntegrityError:
+            return {"message": "This time slot is already booked"}, 409
 
         return {"message": "Appointment booked", "appointment_id": appt.id}, 201
 
     @role_required("patient")
     def get(self):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
-        if not patient:
+        patient_id = current_patient_id()
+        if not patient_id:
             return {"message": "Patient profile not found"}, 404
 
         appts = (
             session.query(Appointment)
-            .filter(Appointment.patient_id == patient.id)
+            .options(
+                joinedload(Appointment.doctor).joinedload(DoctorProfile.specialization)
+            )
+            .filter(Appointment.patient_id == patient_id)
             .order_by(Appointment.date.desc(), Appointment.time.desc())
             .all()
         )
 
-        result = []
-        for a in appts:
-            result.append({
-                "id": a.id,
-                "date": a.date.isoformat(),
-                "time": a.time.strftime("%H:%M"),
-                "status": a.status.value,
-                "doctor": {
-                    "id": a.doctor.id,
-                    "name": a.doctor.full_name,
-                    "specialization": a.doctor.specialization.name if a.doctor.specialization else None,
-
-                },
-            })
-
-        return {"appointments": result}, 200
+        return {"appointments": dump_many(patient_appointment, appts)}, 200
 
 
 class PatientAppointmentDetailAPI(Resource):
@@ -287,31 +381,15 @@ class PatientAppointmentDetailAPI(Resource):
     @role_required("patient")
     def get(self, appointment_id):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
-        if not patient:
+        patient_id = current_patient_id()
+        if not patient_id:
             return {"message": "Patient profile not found"}, 404
 
         appt = session.query(Appointment).get(appointment_id)
-        if not appt or appt.patient_id != patient.id:
+        if not appt or appt.patient_id != patient_id:
             return {"message": "Appointment not found"}, 404
 
-        return {
-            "id": appt.id,
-            "date": appt.date.isoformat(),
-            "time": appt.time.strftime("%H:%M"),
-            "status": appt.status.value,
-            "notes": appt.notes,
-            "doctor": {
-                "id": appt.doctor.id,
-                "name": appt.doctor.full_name,
-                "specialization": appt.doctor.specialization.name if appt.doctor.specialization else None,
-                "experience": appt.doctor.experience,
-                "fees": appt.doctor.fees,
-            }
-        }, 200
+        return patient_appointment_detail(appt), 200
 
 
 class PatientCancelAppointmentAPI(Resource):
@@ -319,15 +397,12 @@ class PatientCancelAppointmentAPI(Resource):
     @role_required("patient")
     def put(self, appointment_id):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
-        if not patient:
+        patient_id = current_patient_id()
+        if not patient_id:
             return {"message": "Patient profile not found"}, 404
 
         appt = session.query(Appointment).get(appointment_id)
-        if not appt or appt.patient_id != patient.id:
+        if not appt or appt.patient_id != patient_id:
             return {"message": "Appointment not found"}, 404
 
         if appt.status == AppointmentStatus.CANCELLED:
@@ -2,9 +2,12 @@
 
 from flask_restful import Resource
 from datetime import date
-from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import case, func
+from sqlalchemy.orm import contains_eager, joinedload
 
 from database import get_db_session
+from cache.cache_utils import cache_generation, DOCTOR_DIRECTORY
+from utils.conditional import conditional, row_version
 
 from models import (
     PatientProfile,
@@ -14,73 +17,93 @@ from models import (
     DoctorProfile
 )
 
-from utils.auth import role_required
+from utils.auth import current_patient_id, role_required
+
+
+def dashboard_version():
+    session = get_db_session()
+    patient_id = current_patient_id()
+
+    # Outer join so appointments without a record still count.
+    count, newest = row_version(
+        session.query(Appointment)
+        .outerjoin(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
+        .filter(Appointment.patient_id == patient_id),
+        Appointment, MedicalRecord,
+    )
+    return (
+        count,
+        newest,
+        cache_generation(DOCTOR_DIRECTORY),
+        date.today(),
+    ), None
 
 
 class PatientDashboard(Resource):
 
     @role_required("patient")
+    @conditional(dashboard_version)
     def get(self):
         session = get_db_session()
 
-        user_id = int(get_jwt_identity())
-
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
-        if not patient:
+        patient_id = current_patient_id()
+        if not patient_id:
             return {"message": "Patient profile not found"}, 404
 
-        total_appointments = (
-            session.query(Appointment)
-            .filter(Appointment.patient_id == patient.id)
-            .count()
+        today = date.today()
+        closed_statuses = (AppointmentStatus.CANCELLED, AppointmentStatus.COMPLETED)
+
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        total_appointments, completed_appointments, upcoming_count = (
+            session.query(
+                func.count(Appointment.id),
+                count_where(Appointment.status == AppointmentStatus.COMPLETED),
+                count_where(
+                    (Appointment.date >= today)
+                    & Appointment.status.notin_(closed_statuses)
+                ),
+            )
+            .filter(Appointment.patient_id == patient_id)
+            .one()
         )
 
-        completed_appointments = (
-            session.query(Appointment)
-            .filter(Appointment.patient_id == patient.id)
-            .filter(Appointment.status == AppointmentStatus.COMPLETED)
-            .count()
+        with_doctor = joinedload(Appointment.doctor).joinedload(
+            DoctorProfile.specialization
         )
 
-        upcoming_count = (
-            session.query(Appointment)
-            .filter(Appointment.patient_id == patient.id)
-            .filter(Appointment.date >= date.today())
-            .filter(Appointment.status != AppointmentStatus.CANCELLED)
-            .filter(Appointment.status != AppointmentStatus.COMPLETED)
-            .count()
-        )
+        def doctor_data(doctor):
+            return {
+                "id": doctor.id,
+                "name": doctor.full_name,
+                "specialization": doctor.specialization.name if doctor.specialization else None,
+            }
 
         upcoming_appt = (
             session.query(Appointment)
-            .filter(Appointment.patient_id == patient.id)
-            .filter(Appointment.date >= date.today())
-            .filter(Appointment.status != AppointmentStatus.CANCELLED)
-            .filter(Appointment.status != AppointmentStatus.COMPLETED)
+            .options(with_doctor)
+            .filter(Appointment.patient_id == patient_id)
+            .filter(Appointment.date >= today)
+            .filter(Appointment.status.notin_(closed_statuses))
             .order_by(Appointment.date.asc(), Appointment.time.asc())
             .first()
         )
 
         upcoming_data = None
         if upcoming_appt:
-            doctor = session.query(DoctorProfile).get(upcoming_appt.doctor_id)
-
             upcoming_data = {
                 "id": upcoming_appt.id,
                 "date": upcoming_appt.date.isoformat(),
                 "time": upcoming_appt.time.strftime("%H:%M"),
                 "status": upcoming_appt.status.value,
-                "doctor": {
-                    "id": doctor.id,
-                    "name": doctor.full_name,
-                    "specialization": doctor.specialization.name if doctor.specialization else None,
-                }
+                "doctor": doctor_data(upcoming_appt.doctor),
             }
 
         recent_appts = (
             session.query(Appointment)
-            .filter(Appointment.patient_id == patient.id)
+            .options(with_doctor)
+            .filter(Appointment.patient_id == patient_id)
             .order_by(Appointment.date.desc(), Appointment.time.desc())
             .limit(5)
             .all()
@@ -88,24 +111,23 @@ class PatientDashboard(Resource):
 
         recent_appointments = []
         for ap in recent_appts:
-            doctor = session.query(DoctorProfile).get(ap.doctor_id)
-
             recent_appointments.append({
                 "id": ap.id,
                 "date": ap.date.isoformat(),
                 "time": ap.time.strftime("%H:%M"),
                 "status": ap.status.value,
-                "doctor": {
-                    "id": doctor.id,
-                    "name": doctor.full_name,
-                    "specialization": doctor.specialization.name if doctor.specialization else None,
-                }
+                "doctor": doctor_data(ap.doctor),
             })
 
         recent_records_q = (
             session.query(MedicalRecord)
             .join(Appointment, MedicalRecord.appointment_id == Appointment.id)
-            .filter(Appointment.patient_id == patient.id)
+            .options(
+                contains_eager(MedicalRecord.appointment)
+                .joinedload(Appointment.doctor)
+                .joinedload(DoctorProfile.specialization)
+            )
+            .filter(Appointment.patient_id == patient_id)
             .order_by(MedicalRecord.created_at.desc())
             .limit(5)
             .all()
@@ -113,8 +135,7 @@ class PatientDashboard(Resource):
 
         recent_records = []
         for rec in recent_records_q:
-            ap = session.query(Appointment).get(rec.appointment_id)
-            doctor = session.query(DoctorProfile).get(ap.doctor_id)
+            ap = rec.appointment
 
             recent_records.append({
                 "id": rec.id,
@@ -125,11 +146,7 @@ class PatientDashboard(Resource):
                 "prescription": rec.prescription,
                 "notes": rec.notes,
                 "date": ap.date.isoformat(),
-                "doctor": {
-                    "id": doctor.id,
-                    "name": doctor.full_name,
-                    "specialization": doctor.specialization.name if doctor.specialization else None,
-                }
+                "doctor": doctor_data(ap.doctor),
             })
 
         return {
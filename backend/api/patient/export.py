@@ -1,7 +1,10 @@
+from uuid import uuid4
+
 from flask_restful import Resource
 from flask_jwt_extended import get_jwt_identity
 from utils.auth import role_required
 from tasks.background_jobs import export_patient_treatments_csv
+from tasks.task_logger import get_owned_log, register_log
 
 
 class PatientExportTreatmentsAPI(Resource):
@@ -14,7 +17,28 @@ class PatientExportTreatmentsAPI(Resource):
         """
         user_id = int(get_jwt_identity())
 
-        export_patient_treatments_csv(user_id)
+        # The log exists (and is owned) before the worker can pick the task up.
+        task_id = str(uuid4())
+        register_log(task_id, export_patient_treatments_csv.name, user_id)
+        export_patient_treatments_csv.apply_async((user_id,), task_id=task_id)
+
         return {
-            "message": "Export started. You will receive an email once it's ready."
+            "message": "Export started. You will receive an email once it's ready.",
+            "task_id": task_id,
         }, 202
+
+
+class PatientExportStatusAPI(Resource):
+
+    @role_required("patient")
+    def get(self, task_id):
+        """
+        GET /patient/export-treatments/<task_id>
+        Progress of an export the patient started.
+        """
+        log = get_owned_log(task_id, int(get_jwt_identity()))
+        if not log:
+            return {"message": "Task not found"}, 404
+
+        log.pop("owner_id", None)
+        return log, 200
@@ -1,8 +1,8 @@
 from flask_restful import Resource
 from flask import request
-from flask_jwt_extended import get_jwt_identity
-from utils.auth import role_required
+from utils.auth import current_patient, role_required
 from database import get_db_session
+from cache.cache_utils import bump_generation, PATIENT_DIRECTORY
 
 from models import User, PatientProfile
 
@@ -12,18 +12,14 @@ class PatientProfileAPI(Resource):
     @role_required("patient")
     def get(self):
         """Return patient + user profile data"""
-        session = get_db_session()
-        user_id = int(get_jwt_identity())
+        patient = current_patient()
+        if not patient:
+            return {"message": "Patient profile not found"}, 404
 
-        user = session.query(User).get(user_id)
+        user = patient.user
         if not user:
             return {"message": "User not found"}, 404
 
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
-        if not patient:
-            return {"message": "Patient profile not found"}, 404
-
         return {
             "id": patient.id,
             "name": user.name,
@@ -38,11 +34,9 @@ class PatientProfileAPI(Resource):
         """Update patient + user profile data"""
 
         session = get_db_session()
-        user_id = int(get_jwt_identity())
 
-        user = session.query(User).get(user_id)
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
+        patient = current_patient()
+        user = patient.user if patient else None
 
         if not user or not patient:
             return {"message": "Profile not found"}, 404
@@ -65,5 +59,6 @@ class PatientProfileAPI(Resource):
             patient.address = data["address"]
 
         session.commit()
+        bump_generation(PATIENT_DIRECTORY)
 
         return {"message": "Profile updated successfully"}, 200
@@ -1,36 +1,31 @@
 from flask_restful import Resource
-from flask_jwt_extended import get_jwt_identity
-from utils.auth import role_required
-from models import Appointment, MedicalRecord, PatientProfile
+from utils.auth import current_patient_id, role_required
+from utils.serializers import dump_many, patient_record
+from sqlalchemy.orm import contains_eager, joinedload
+from models import Appointment, MedicalRecord, PatientProfile, DoctorProfile
 from database import get_db_session
+from utils.conditional import conditional, history_version
 
 
 class PatientMedicalRecordsAPI(Resource):
 
     @role_required("patient")
+    @conditional(lambda: history_version(current_patient_id()))
     def get(self):
         session = get_db_session()
-        user_id = int(get_jwt_identity())
-
-        patient = session.query(PatientProfile).filter_by(
-            user_id=user_id).first()
+        patient_id = current_patient_id()
+        if not patient_id:
+            return {"message": "Patient profile not found"}, 404
 
         appointments = (
             session.query(Appointment)
-            .filter_by(patient_id=patient.id)
+            .join(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
+            .options(
+                contains_eager(Appointment.medical_record),
+                joinedload(Appointment.doctor).joinedload(DoctorProfile.specialization),
+            )
+            .filter(Appointment.patient_id == patient_id)
             .all()
         )
 
-        records = []
-        for a in appointments:
-            if a.medical_record:
-                r = a.medical_record.to_dict()
-                r["doctor"] = {
-                    "id": a.doctor.id,
-                    "name": a.doctor.full_name,
-                    "specialization": a.doctor.specialization.name if a.doctor.specialization else None
-                }
-                r["date"] = a.date.isoformat()
-                records.append(r)
-
-        return records, 200
+        return dump_many(patient_record, appointments), 200
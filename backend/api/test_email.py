@@ -1,14 +1,22 @@
-
-
+from flask_jwt_extended import get_jwt_identity
 from flask_restful import Resource
-from utils.notifications import send_email
+from database import get_db_session
+from models import User
+from utils.auth import admin_required
+from utils.notifications import queue_email
 
 
 class TestEmail(Resource):
-    def get(self):
-        send_email(
-            "myemails.855@gmail.com",
+    @admin_required
+    def post(self):
+        """Queue a test email to the calling admin's own address."""
+        session = get_db_session()
+        admin = session.get(User, int(get_jwt_identity()))
+
+        queue_email(
+            admin.email,
             "SMTP Test",
             "<p>If you got this, SMTP is working! 🎉</p>"
         )
-        return {"message": "sent"}, 200
+        session.commit()
+        return {"message": "queued", "to": admin.email}, 202
@@ -8,6 +8,7 @@ from database import init_db
 from api import register_routes
 from flask_jwt_extended import JWTManager
 from ext import mail
+from utils.serializers import output_orjson
 
 jwt = JWTManager()
 load_dotenv()
@@ -24,6 +25,7 @@ def create_app():
     jwt.init_app(app)
 
     api = Api(app)
+    api.representations["application/json"] = output_orjson
     register_routes(api)
 
     mail.init_app(app)
@@ -0,0 +1,76 @@
+"""
+Treatment-history export (tasks.export_patient_treatments_csv) for one
+patient with N records: wall time, peak Python memory while exporting,
+and what ends up in the outbox row.
+
+    python -m benchmarks.export [records]   # default 50000
+"""
+import gzip
+import json
+import os
+import sys
+import tracemalloc
+from datetime import date, time, timedelta
+
+from benchmarks.harness import make_doctor, make_patient, session, timed
+
+from models import Appointment, AppointmentStatus, EmailOutbox, MedicalRecord
+from tasks.background_jobs import export_patient_treatments_csv
+
+
+def seed(patient, doctors, count):
+    start = date(2000, 1, 1)
+    appointments = [
+        {
+            "patient_id": patient.id,
+            "doctor_id": doctors[i % len(doctors)].id,
+            "date": start + timedelta(days=i // 16),
+            "time": time(8 + (i % 16) // 2, (i % 2) * 30),
+            "status": AppointmentStatus.COMPLETED,
+        }
+        for i in range(count)
+    ]
+    session.bulk_insert_mappings(Appointment, appointments)
+    session.flush()
+
+    ids = [a for (a,) in session.query(Appointment.id).filter_by(patient_id=patient.id)]
+    session.bulk_insert_mappings(MedicalRecord, [
+        {
+            "appointment_id": appointment_id,
+            "visit_type": "Clinic",
+            "tests_done": "CBC, lipid panel",
+            "diagnosis": "Seasonal allergy with mild congestion",
+            "medicines": "Cetirizine 10mg",
+            "prescription": "Once daily for 5 days",
+            "notes": "Follow up in two weeks",
+        }
+        for appointment_id in ids
+    ])
+    session.commit()
+
+
+def main(count):
+    patient = make_patient()
+    doctors = [make_doctor(f"Dr Bench {i}") for i in range(10)]
+    with timed(f"seed {count:,} records"):
+        seed(patient, doctors, count)
+
+    tracemalloc.start()
+    with timed("export", count):
+        print(export_patient_treatments_csv.apply(args=[patient.user_id]).get())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    row = session.query(EmailOutbox).one()
+    path = json.loads(row.attachments)[0]["path"]
+    size = os.path.getsize(path)
+    with gzip.open(path, "rb") as f:
+        raw = sum(len(chunk) for chunk in iter(lambda: f.read(1 << 20), b""))
+
+    print(f"peak memory: {peak / 1e6:.1f} MB")
+    print(f"attachment: {size / 1e6:.2f} MB gzip, {raw / 1e6:.1f} MB csv")
+    print(f"outbox row attachments column: {len(row.attachments)} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
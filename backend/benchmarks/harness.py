@@ -0,0 +1,102 @@
+"""
+Throwaway environment for the benchmark scripts, the same one the tests
+use: a temp SQLite database and an in-memory Redis. Import it before
+anything from the app:
+
+    from benchmarks.harness import app, session, timed
+
+Run a script from backend/ with `python -m benchmarks.<name>`; they need
+requirements-dev.txt installed.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+_dir = tempfile.mkdtemp(prefix="hms-bench-")
+atexit.register(shutil.rmtree, _dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_dir, "bench.db")
+os.environ["EMAIL_ATTACHMENT_DIR"] = os.path.join(_dir, "attachments")
+
+import fakeredis  # noqa: E402
+import redis  # noqa: E402
+
+_redis_server = fakeredis.FakeServer()
+
+
+class _FakeRedis(fakeredis.FakeStrictRedis):
+    def __init__(self, *args, **kwargs):
+        kwargs.pop("host", None)
+        kwargs.pop("port", None)
+        super().__init__(*args, server=_redis_server, **kwargs)
+
+
+redis.Redis = redis.StrictRedis = _FakeRedis
+
+from app import app  # noqa: E402
+import database  # noqa: E402
+from models import (  # noqa: E402
+    DoctorProfile,
+    PatientProfile,
+    Specialization,
+    User,
+    UserRole,
+)
+
+session = database.Session.session_factory()
+
+
+@contextmanager
+def timed(label, count=None):
+    """Print how long the block took, and the rate if `count` is given."""
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    rate = f" ({count / elapsed:,.0f}/s)" if count else ""
+    print(f"{label}: {elapsed * 1000:,.1f} ms{rate}")
+
+
+def make_doctor(name="Dr Bench"):
+    spec = session.query(Specialization).first()
+    if spec is None:
+        spec = Specialization(name="General")
+        session.add(spec)
+        session.flush()
+
+    user = User(
+        name=name,
+        email=f"{name.lower().replace(' ', '.')}@hospital.test",
+        password="x",
+        role=UserRole.DOCTOR,
+    )
+    session.add(user)
+    session.flush()
+
+    doctor = DoctorProfile(
+        user_id=user.id,
+        full_name=name,
+        specialization_id=spec.id,
+        is_active=True,
+        is_verified=True,
+    )
+    session.add(doctor)
+    session.commit()
+    return doctor
+
+
+def make_patient(name="Bench Patient"):
+    user = User(
+        name=name,
+        email=f"{name.lower().replace(' ', '.')}@patient.test",
+        password="x",
+        role=UserRole.PATIENT,
+    )
+    session.add(user)
+    session.flush()
+
+    patient = PatientProfile(user_id=user.id, age=30, gender="F", phone="1", address="-")
+    session.add(patient)
+    session.commit()
+    return patient
@@ -0,0 +1,66 @@
+"""
+Logins per second per core through POST /auth/login, for a doctor, under
+each password-hash method. The first login with a new method rehashes
+the stored password, as in production; it is left out of the timing.
+Pin the process to one core for per-core numbers:
+
+    taskset -c 0 python -m benchmarks.login [seconds] [method ...]
+"""
+import sys
+import time
+
+from benchmarks.harness import app, make_doctor, session
+
+from sqlalchemy import event
+
+import database
+from models import User
+from utils.passwords import hash_password
+
+METHODS = [
+    "scrypt:32768:8:1",
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:260000",
+]
+
+
+def main(seconds, methods):
+    doctor = make_doctor()
+    user = session.get(User, doctor.user_id)
+    with app.app_context():
+        user.password = hash_password("pw")
+    session.commit()
+
+    client = app.test_client()
+    # Mixed case: the lookup is case-insensitive.
+    body = {"email": user.email.upper(), "password": "pw", "role": "doctor"}
+
+    selects = []
+    event.listen(
+        database.engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: selects.append(statement)
+        if statement.lstrip().upper().startswith("SELECT") else None,
+    )
+
+    for method in methods:
+        app.config["PASSWORD_HASH_METHOD"] = method
+        assert client.post("/auth/login", json=body).status_code == 200
+
+        selects.clear()
+        logins = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            assert client.post("/auth/login", json=body).status_code == 200
+            logins += 1
+        elapsed = time.perf_counter() - started
+
+        print(f"{method:24} {logins / elapsed:6.1f} logins/s ({elapsed / logins * 1000:.0f} ms), "
+              f"{len(selects) / logins:.0f} SELECT per login")
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 3,
+        sys.argv[2:] or METHODS,
+    )
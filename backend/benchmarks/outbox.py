@@ -0,0 +1,110 @@
+"""
+Email outbox throughput against a local SMTP sink that takes `latency`
+seconds per message:
+
+- what a request pays: one SMTP connection per message (the old
+  send_email) vs queue_email plus its commit;
+- how fast tasks.deliver_email_outbox drains a backlog, unthrottled and
+  at EMAIL_SEND_RATE.
+
+    python -m benchmarks.outbox [messages] [latency]   # default 500 0.002
+"""
+import socketserver
+import sys
+import threading
+import time
+
+from benchmarks.harness import app, session, timed
+
+from ext import mail
+from models import EmailOutbox, EmailStatus
+from tasks.celery_app import celery
+from tasks.email_jobs import deliver_email_outbox
+from utils.notifications import build_message, email_connection, queue_email
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.latency = latency
+        self.received = 0
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: accept everything, count messages."""
+
+    def reply(self, line):
+        self.wfile.write(line + b"\r\n")
+
+    def handle(self):
+        self.reply(b"220 sink")
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b"QUIT":
+                self.reply(b"221 bye")
+                return
+            if command == b"DATA":
+                self.reply(b"354 go ahead")
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                time.sleep(self.server.latency)
+                self.server.received += 1
+            self.reply(b"250 ok")
+
+
+def main(count, latency):
+    sink = SMTPSink(latency)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+
+    app.config.update(
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=sink.server_address[1],
+        MAIL_USE_TLS=False,
+        MAIL_USERNAME=None,
+        MAIL_PASSWORD=None,
+        MAIL_SUPPRESS_SEND=False,
+        MAIL_DEBUG=False,
+        EMAIL_SEND_RATE=0,
+    )
+    mail.init_app(app)
+    # A full batch re-queues the drain; run those inline.
+    celery.conf.task_always_eager = True
+
+    with app.app_context():
+        calls = 50
+        with timed(f"{calls} sends, one connection each", calls):
+            for _ in range(calls):
+                with email_connection() as conn:
+                    conn.send(build_message("a@example.test", "s", "<p>hi</p>"))
+
+        with timed(f"{count} queue_email + commit", count):
+            for i in range(count):
+                queue_email("a@example.test", f"s{i}", "<p>hi</p>", session=session)
+                session.commit()
+
+        sink.received = 0
+        with timed(f"drain {count} in batches of 100, unthrottled", count):
+            deliver_email_outbox.apply(args=(100,)).get()
+        print(f"  sink received {sink.received}, "
+              f"{session.query(EmailOutbox).filter_by(status=EmailStatus.SENT).count()} rows SENT")
+
+        rate, paced = 20, 40
+        app.config["EMAIL_SEND_RATE"] = rate
+        for i in range(paced):
+            queue_email("a@example.test", f"r{i}", "<p>hi</p>", session=session)
+        session.commit()
+        with timed(f"drain {paced} at EMAIL_SEND_RATE={rate}", paced):
+            deliver_email_outbox.apply(args=(100,)).get()
+
+    sink.shutdown()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.002,
+    )
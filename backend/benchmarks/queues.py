@@ -0,0 +1,91 @@
+"""
+Reminder latency while an export backlog drains, with every task on one
+default queue vs routed as tasks/celery_app.py routes them. Uses an
+in-memory broker and threaded workers with synthetic tasks (a 200 ms
+export, a 5 ms reminder); the harness stands in for the Redis the task
+log signals write to.
+
+    python -m benchmarks.queues [exports] [reminders]   # default 150 30
+"""
+import statistics
+import sys
+import time
+
+import benchmarks.harness  # noqa: F401
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+
+from tasks.celery_app import WORKER_QUEUES, celery as configured
+
+
+# Stand-ins for the real tasks, routed and annotated the way they are.
+STAND_INS = {
+    "bench.export": "tasks.export_patient_treatments_csv",
+    "bench.remind": "tasks.send_reminder_chunk",
+}
+
+
+def run(routed, exports, reminders):
+    routes = configured.conf.task_routes
+    annotations = configured.conf.task_annotations
+
+    app = Celery("bench", broker="memory://", backend="cache+memory://")
+    app.conf.update(
+        task_queues=configured.conf.task_queues,
+        task_default_queue="default",
+        task_routes={name: routes[real] for name, real in STAND_INS.items()} if routed else {},
+        task_annotations={name: annotations[real] for name, real in STAND_INS.items()},
+        # The in-memory transport runs one task at a time per worker with
+        # a multiplier of 1, whatever the concurrency.
+        worker_prefetch_multiplier=4,
+        broker_transport_options={"polling_interval": 0.01},
+    )
+    latencies = []
+
+    @app.task(name="bench.export", shared=False)
+    def export():
+        time.sleep(0.2)
+
+    @app.task(name="bench.remind", shared=False)
+    def remind(queued_at):
+        time.sleep(0.005)
+        latencies.append(time.time() - queued_at)
+
+    if routed:
+        pools = {q: WORKER_QUEUES[q]["concurrency"] for q in ("exports", "reminders")}
+    else:
+        pools = {"default": sum(WORKER_QUEUES[q]["concurrency"] for q in ("exports", "reminders"))}
+
+    workers = [
+        start_worker(app, pool="threads", concurrency=concurrency, queues=[queue],
+                     perform_ping_check=False, shutdown_timeout=60)
+        for queue, concurrency in pools.items()
+    ]
+    for worker in workers:
+        worker.__enter__()
+
+    try:
+        for _ in range(exports):
+            export.delay()
+        started = time.time()
+        for _ in range(reminders):
+            remind.delay(time.time())
+            time.sleep(0.1)
+        while len(latencies) < reminders and time.time() - started < 120:
+            time.sleep(0.05)
+    finally:
+        for worker in workers:
+            worker.__exit__(None, None, None)
+
+    pools = ", ".join(f"{q} c={c}" for q, c in pools.items())
+    print(f"{'routed' if routed else 'one queue'} ({pools}): "
+          f"reminder latency p50 {statistics.median(latencies) * 1000:,.0f} ms, "
+          f"max {max(latencies) * 1000:,.0f} ms over {len(latencies)} reminders")
+
+
+if __name__ == "__main__":
+    exports = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    reminders = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    run(False, exports, reminders)
+    run(True, exports, reminders)
@@ -0,0 +1,136 @@
+"""
+Cost of building and encoding a 10k-appointment admin listing: the dicts
+hand-built as AdminAppointments used to, vs the compiled admin_appointment
+shape; flask-restful's json representation vs output_orjson. Best of N
+runs over in-memory ORM objects, so no query time is included.
+
+    python -m benchmarks.serializers [appointments] [runs]   # default 10000 7
+"""
+import json
+import sys
+import time
+from datetime import date, timedelta
+from datetime import time as clock
+
+from benchmarks.harness import app
+
+import orjson
+from flask_restful.representations.json import output_json
+
+from models import (
+    Appointment,
+    AppointmentStatus,
+    DoctorProfile,
+    MedicalRecord,
+    PatientProfile,
+    Specialization,
+    User,
+)
+from utils.serializers import admin_appointment, dump_many, output_orjson
+
+
+def build(count):
+    specs = [Specialization(name=f"Spec {i}") for i in range(10)]
+    doctors = [
+        DoctorProfile(id=i, full_name=f"Dr {i}", specialization=specs[i % 10],
+                      user=User(email=f"d{i}@hospital.test", name=f"Dr {i}"))
+        for i in range(50)
+    ]
+    patients = [
+        PatientProfile(id=i, age=30, gender="F", phone="123",
+                       user=User(email=f"p{i}@patient.test", name=f"P {i}"))
+        for i in range(500)
+    ]
+
+    appointments = []
+    for i in range(count):
+        appt = Appointment(
+            id=i,
+            date=date(2026, 1, 1) + timedelta(days=i % 300),
+            time=clock(8 + i % 10, 30 * (i % 2)),
+            status=list(AppointmentStatus)[i % 4],
+            notes="note",
+            doctor=doctors[i % 50],
+            patient=patients[i % 500],
+        )
+        if i % 2:
+            appt.medical_record = MedicalRecord(
+                id=i, visit_type="Clinic", tests_done="CBC", diagnosis="Flu",
+                medicines="Rest", prescription="Fluids", notes="n",
+            )
+        appointments.append(appt)
+    return appointments
+
+
+def hand_built(appointments):
+    """The per-handler dict building the compiled shapes replaced."""
+    result = []
+    for a in appointments:
+        record = a.medical_record
+        result.append({
+            "id": a.id,
+            "date": a.date.isoformat(),
+            "time": a.time.strftime("%H:%M"),
+            "status": a.status.value,
+            "notes": a.notes,
+            "doctor": {
+                "id": a.doctor.id,
+                "name": a.doctor.full_name,
+                "specialization": a.doctor.specialization.name if a.doctor.specialization else None,
+                "email": a.doctor.user.email if a.doctor.user else None,
+            } if a.doctor else None,
+            "patient": {
+                "id": a.patient.id,
+                "name": a.patient.user.name if a.patient.user else None,
+                "email": a.patient.user.email if a.patient.user else None,
+                "age": a.patient.age,
+                "gender": a.patient.gender,
+                "phone": a.patient.phone,
+            } if a.patient else None,
+            "record": {
+                "id": record.id,
+                "visit_type": record.visit_type,
+                "tests": record.tests_done,
+                "diagnosis": record.diagnosis,
+                "medicines": record.medicines,
+                "prescription": record.prescription,
+                "notes": record.notes,
+            } if record else None,
+        })
+    return result
+
+
+def best(fn, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main(count, runs):
+    appointments = build(count)
+    assert hand_built(appointments) == dump_many(admin_appointment, appointments)
+    payload = {"items": dump_many(admin_appointment, appointments), "next_cursor": None}
+
+    print(f"{count:,} appointments, best of {runs}:")
+    print(f"  build  hand-built {best(lambda: hand_built(appointments), runs):6.1f} ms   "
+          f"compiled shape {best(lambda: dump_many(admin_appointment, appointments), runs):6.1f} ms")
+
+    for debug in (True, False):
+        app.debug = debug
+        with app.test_request_context():
+            slow = output_json(payload, 200).get_data()
+            fast = output_orjson(payload, 200).get_data()
+            assert json.loads(slow) == orjson.loads(fast)
+            print(f"  encode (DEBUG {'on' if debug else 'off'}) "
+                  f"json {best(lambda: output_json(payload, 200), runs):6.1f} ms ({len(slow):,} B)   "
+                  f"orjson {best(lambda: output_orjson(payload, 200), runs):6.1f} ms ({len(fast):,} B)")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 7,
+    )
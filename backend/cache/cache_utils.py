@@ -1,6 +1,20 @@
 import json
+import time
+import uuid
+from urllib.parse import urlencode
 from .redis_client import redis_client
 
+DOCTOR_DIRECTORY = "patient:doctors"
+# Bumped when a patient is added, renamed or removed.
+PATIENT_DIRECTORY = "patients"
+
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 def cache_set(key, value, ttl=60):
     redis_client.setex(key, ttl, json.dumps(value))
 
@@ -9,3 +23,52 @@ def cache_get(key):
     if not raw:
         return None
     return json.loads(raw)
+
+def cache_generation(namespace):
+    return int(redis_client.get(f"gen:{namespace}") or 0)
+
+def bump_generation(namespace):
+    """Invalidate every key built for `namespace` by moving to a new generation."""
+    return redis_client.incr(f"gen:{namespace}")
+
+def versioned_key(namespace, params=None):
+    """
+    Cache key for `namespace` at its current generation. `params` should
+    already be normalized; they are sorted so equal queries share a key.
+    """
+    query = urlencode(sorted((params or {}).items()))
+    return f"{namespace}:v{cache_generation(namespace)}:{query}"
+
+def cache_get_or_set(key, builder, ttl=60, lock_ttl=10, wait_timeout=5.0, poll_interval=0.05):
+    """
+    Return the cached value for `key`, building it with `builder()` on a miss.
+
+    Only one caller rebuilds a missing entry; concurrent callers wait for it
+    to land instead of hitting the database too. If the builder is slower
+    than `wait_timeout` (or dies), waiters fall back to building themselves.
+    """
+    cached = cache_get(key)
+    if cached is not None:
+        return cached
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+
+    if redis_client.set(lock_key, token, nx=True, ex=lock_ttl):
+        try:
+            value = builder()
+            cache_set(key, value, ttl)
+            return value
+        finally:
+            redis_client.eval(_RELEASE_LOCK, 1, lock_key, token)
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        cached = cache_get(key)
+        if cached is not None:
+            return cached
+        if not redis_client.exists(lock_key):
+            break
+
+    return builder()
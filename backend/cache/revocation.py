@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+import redis
+
+from .redis_client import redis_client
+
+# Source of truth for token checks in role_required/admin_required:
+#   INACTIVE_USERS  set of user ids whose tokens are refused outright
+#   REVOKED_BEFORE  hash user id -> unix time in whole seconds, like the
+#                   tokens' iat; tokens issued in an earlier second are refused
+INACTIVE_USERS = "auth:inactive_users"
+REVOKED_BEFORE = "auth:revoked_before"
+INVALIDATE_CHANNEL = "auth:invalidate"
+
+# Each process keeps a snapshot of both and re-reads it at most this often;
+# a pub/sub message from any process forces an immediate re-read.
+REVOCATION_CACHE_TTL = float(os.getenv("REVOCATION_CACHE_TTL", 5))
+
+
+class _Snapshot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inactive = frozenset()
+        self.revoked_before = {}
+        self.loaded_at = None
+        self.listener = None
+
+
+_snapshot = _Snapshot()
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATE_CHANNEL)
+            for message in pubsub.listen():
+                if message and message.get("type") == "message":
+                    _snapshot.loaded_at = None
+        except redis.RedisError:
+            time.sleep(REVOCATION_CACHE_TTL)
+
+
+def _ensure_listener():
+    if _snapshot.listener is None:
+        with _snapshot.lock:
+            if _snapshot.listener is None:
+                _snapshot.listener = threading.Thread(
+                    target=_listen, name="revocation-listener", daemon=True
+                )
+                _snapshot.listener.start()
+
+
+def _current():
+    _ensure_listener()
+
+    loaded_at = _snapshot.loaded_at
+    if loaded_at is not None and time.monotonic() - loaded_at < REVOCATION_CACHE_TTL:
+        return _snapshot
+
+    with _snapshot.lock:
+        if _snapshot.loaded_at is loaded_at:
+            try:
+                pipe = redis_client.pipeline()
+                pipe.smembers(INACTIVE_USERS)
+                pipe.hgetall(REVOKED_BEFORE)
+                inactive, revoked_before = pipe.execute()
+            except redis.RedisError:
+                # Keep serving the last snapshot until Redis is back.
+                _snapshot.loaded_at = time.monotonic()
+                return _snapshot
+
+            _snapshot.inactive = frozenset(int(u) for u in inactive)
+            _snapshot.revoked_before = {
+                int(u): int(float(ts)) for u, ts in revoked_before.items()
+            }
+            _snapshot.loaded_at = time.monotonic()
+
+    return _snapshot
+
+
+def is_token_revoked(claims):
+    """True if the token's user is suspended or the token predates a revocation."""
+    snapshot = _current()
+    user_id = int(claims["sub"])
+
+    if user_id in snapshot.inactive:
+        return True
+
+    revoked_before = snapshot.revoked_before.get(user_id)
+    return revoked_before is not None and claims.get("iat", 0) < revoked_before
+
+
+def _publish():
+    redis_client.publish(INVALIDATE_CHANNEL, "1")
+
+
+def set_user_active(user_id, is_active):
+    """Mirror an account's active flag into the deactivation list."""
+    if is_active:
+        redis_client.srem(INACTIVE_USERS, user_id)
+    else:
+        redis_client.sadd(INACTIVE_USERS, user_id)
+    _publish()
+
+
+def revoke_user_tokens(user_id):
+    """
+    Refuse every token issued to the user before the current second. iat
+    only has whole seconds, so a token issued later in this same second
+    (e.g. the login after a password change) must stay valid.
+    """
+    redis_client.hset(REVOKED_BEFORE, user_id, int(time.time()))
+    _publish()
+
+
+def sync_inactive_users(user_ids):
+    """Replace the deactivation list, e.g. after Redis lost its data."""
+    pipe = redis_client.pipeline()
+    pipe.delete(INACTIVE_USERS)
+    if user_ids:
+        pipe.sadd(INACTIVE_USERS, *user_ids)
+    pipe.execute()
+    _publish()
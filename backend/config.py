@@ -9,9 +9,33 @@ class Config:
     SQLALCHEMY_DATABASE_URI = None
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # One pool per process; size it against gunicorn workers x threads.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": True,
+    }
+
     SESSION_COOKIE_NAME = "session"
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
 
+    # werkzeug method string; stored hashes made with other parameters are
+    # rehashed on the user's next successful login.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+    # Email outbox delivery (tasks.deliver_email_outbox)
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 100))
+    EMAIL_SEND_RATE = float(os.getenv("EMAIL_SEND_RATE", 10))  # messages/second, 0 = unlimited
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_RETRY_BACKOFF = int(os.getenv("EMAIL_RETRY_BACKOFF", 60))  # seconds, doubled per attempt
+    # Large attachments stay here until their email is sent or dead; the
+    # outbox row only holds the path, so every worker must see this directory.
+    EMAIL_ATTACHMENT_DIR = os.getenv(
+        "EMAIL_ATTACHMENT_DIR", os.path.join(basedir, "data", "attachments")
+    )
+
     FRONT_END_BASE = os.getenv("FRONT_END_BASE", "http://localhost:5173")
     CORS_ORIGIN = FRONT_END_BASE
 
@@ -20,7 +44,9 @@ class LocalDevelopmentConfig(Config):
     SQLITE_DB_DIR = os.path.join(basedir, "data")
     if not os.path.exists(SQLITE_DB_DIR):
         os.makedirs(SQLITE_DB_DIR)
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(SQLITE_DB_DIR, 'dev_database.db')
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "DATABASE_URL", 'sqlite:///' + os.path.join(SQLITE_DB_DIR, 'dev_database.db')
+    )
 
     SECRET_KEY = os.getenv("SECRET_KEY", "a_development_secret_key")
 
@@ -1,6 +1,9 @@
 import os
+import time
+from threading import Lock
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import sessionmaker, scoped_session
 from flask_migrate import Migrate
 
@@ -9,22 +12,45 @@ engine = None
 Session = None
 migrate = None
 
+# How long sessions take to get a usable connection: from the start of a
+# transaction to its connection being ready. Pool waits dominate it when
+# the pool is exhausted, but it also covers opening new connections and
+# pre-ping round trips.
+_acquire_lock = Lock()
+_acquire_stats = {"acquisitions": 0, "total_time": 0.0, "max_time": 0.0}
+
 def init_db(app):
     global engine, Session, migrate
     
     db.init_app(app)
 
-    db_uri = app.config.get('SQLALCHEMY_DATABASE_URI')
-    engine = create_engine(db_uri, future=True)
+    # Reuse the Flask-SQLAlchemy engine (sized by SQLALCHEMY_ENGINE_OPTIONS)
+    # so requests and background jobs share one connection pool.
+    with app.app_context():
+        engine = db.engine
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    event.listen(session_factory, "after_transaction_create", _mark_acquire_start)
+    event.listen(session_factory, "after_begin", _record_acquire_time)
+
+    Session = scoped_session(session_factory)
 
-    Session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    @app.teardown_appcontext
+    def shutdown_session(exception=None):
+        remove_db_session()
 
     migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'))
 
     with app.app_context():
         db.create_all()
-        from models import User, UserRole
-        from werkzeug.security import generate_password_hash
+        from models import User, UserRole, DoctorProfile
+        from cache.revocation import sync_inactive_users
+        from redis import RedisError
+        from sqlalchemy import or_
+        from utils.doctor_search import ensure_doctor_search_index
+        from utils.passwords import hash_password
+
+        ensure_doctor_search_index(engine)
 
         session = Session()
 
@@ -36,7 +62,7 @@ def init_db(app):
             admin = User(
                 name="Super Admin",
                 email=default_admin_email,
-                password=generate_password_hash("admin123"),
+                password=hash_password("admin123"),
                 role=UserRole.ADMIN
             )
             session.add(admin)
@@ -44,6 +70,16 @@ def init_db(app):
             print("✨ Default Admin Created → admin@hospital.com / admin123")
         else:
             print("✔ Default admin already exists")
+
+        inactive_users = [
+            user_id for (user_id,) in session.query(User.id)
+            .outerjoin(DoctorProfile, DoctorProfile.user_id == User.id)
+            .filter(or_(User.is_active.is_(False), DoctorProfile.is_active.is_(False)))
+        ]
+        try:
+            sync_inactive_users(inactive_users)
+        except RedisError:
+            print("⚠ Redis unavailable, deactivation list not synced")
     print(f"Database initialized and alembic migrations environment ready at {migrate.directory}")
 
 def get_db_session():
@@ -58,3 +94,69 @@ def close_db_session(session):
         session.close()
     except Exception:
         pass
+
+def commit_with_retry(session, work, attempts=3, backoff=0.05):
+    """
+    Run `work(session)` and commit, retrying from scratch while the database
+    is busy (e.g. SQLite "database is locked"). Constraint violations are
+    not retried: the session is rolled back and the IntegrityError raised.
+    """
+    for attempt in range(attempts):
+        try:
+            result = work(session)
+            session.commit()
+            return result
+        except IntegrityError:
+            session.rollback()
+            raise
+        except OperationalError:
+            session.rollback()
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+
+def remove_db_session():
+    """Close the current thread's session and return its connection to the pool."""
+    if Session is not None:
+        Session.remove()
+
+def _mark_acquire_start(session, transaction):
+    if transaction.parent is None:
+        session.info["acquire_started"] = time.perf_counter()
+
+def _record_acquire_time(session, transaction, connection):
+    started = session.info.pop("acquire_started", None)
+    if started is None:
+        return
+
+    took = time.perf_counter() - started
+    with _acquire_lock:
+        _acquire_stats["acquisitions"] += 1
+        _acquire_stats["total_time"] += took
+        _acquire_stats["max_time"] = max(_acquire_stats["max_time"], took)
+
+def get_pool_stats():
+    """Snapshot of the shared engine's connection pool."""
+    if engine is None:
+        raise Exception("Database engine is not initialized. Call init_db(app) first.")
+
+    pool = engine.pool
+
+    with _acquire_lock:
+        acquisitions = _acquire_stats["acquisitions"]
+        total_time = _acquire_stats["total_time"]
+        max_time = _acquire_stats["max_time"]
+
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        "connection_acquire": {
+            "count": acquisitions,
+            "avg_ms": round(total_time / acquisitions * 1000, 3) if acquisitions else 0.0,
+            "max_ms": round(max_time * 1000, 3),
+        },
+        "status": pool.status(),
+    }
@@ -0,0 +1,66 @@
+"""appointment and availability hot-path indexes
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-18 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_appointments_doctor_date_time", "appointments",
+     ["doctor_id", "date", "time"], False),
+    ("ix_appointments_patient_date", "appointments",
+     ["patient_id", "date"], False),
+    ("uq_doctor_availability_doctor_date_slot", "doctor_daily_availability",
+     ["doctor_id", "date", "slot_type"], True),
+]
+
+
+def _existing_indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    return {ix["name"] for ix in inspector.get_indexes(table)}
+
+
+def upgrade():
+    # The unique index cannot be built over duplicated doctor/date/slot_type
+    # rows; list them and stop rather than guess which one to keep.
+    duplicates = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT doctor_id, date, slot_type, COUNT(*)
+            FROM doctor_daily_availability
+            GROUP BY doctor_id, date, slot_type
+            HAVING COUNT(*) > 1
+            """
+        )
+    ).all()
+    if duplicates:
+        listing = ", ".join(
+            f"doctor {doctor_id} {day} {slot_type} ({count})"
+            for doctor_id, day, slot_type, count in duplicates
+        )
+        raise RuntimeError(
+            f"Duplicate availability rows: {listing}. Remove the extra rows "
+            "before applying this migration."
+        )
+
+    # Databases bootstrapped with db.create_all() already carry the indexes.
+    for name, table, columns, unique in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
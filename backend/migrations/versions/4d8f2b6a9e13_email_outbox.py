@@ -0,0 +1,55 @@
+"""email outbox
+
+Revision ID: 4d8f2b6a9e13
+Revises: e2a5f7c81b36
+Create Date: 2026-10-18 23:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8f2b6a9e13'
+down_revision = 'e2a5f7c81b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases bootstrapped with db.create_all() already have the table.
+    if sa.inspect(op.get_bind()).has_table("email_outbox"):
+        return
+
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("recipients", sa.Text(), nullable=False),
+        sa.Column("cc", sa.Text(), nullable=True),
+        sa.Column("bcc", sa.Text(), nullable=True),
+        sa.Column("subject", sa.String(length=255), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("attachments", sa.Text(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "SENDING", "SENT", "DEAD", name="emailstatus"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_email_outbox_status_next_attempt",
+        "email_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_email_outbox_status_next_attempt", table_name="email_outbox")
+    op.drop_table("email_outbox")
+    sa.Enum(name="emailstatus").drop(op.get_bind(), checkfirst=True)
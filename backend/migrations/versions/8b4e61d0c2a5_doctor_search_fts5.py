@@ -0,0 +1,105 @@
+"""doctor directory FTS5 search index
+
+Revision ID: 8b4e61d0c2a5
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e61d0c2a5'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+TRIGGERS = [
+    "doctor_search_ai",
+    "doctor_search_au",
+    "doctor_search_ad",
+    "doctor_search_user_au",
+    "doctor_search_spec_au",
+]
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends keep the LIKE search.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS doctor_search USING fts5(
+            full_name, user_name, specialization,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS doctor_search_ai AFTER INSERT ON doctor_profiles BEGIN
+            INSERT INTO doctor_search (rowid, full_name, user_name, specialization)
+            SELECT NEW.id, NEW.full_name,
+                   (SELECT name FROM users WHERE id = NEW.user_id),
+                   (SELECT name FROM specializations WHERE id = NEW.specialization_id);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS doctor_search_au AFTER UPDATE ON doctor_profiles BEGIN
+            DELETE FROM doctor_search WHERE rowid = OLD.id;
+            INSERT INTO doctor_search (rowid, full_name, user_name, specialization)
+            SELECT NEW.id, NEW.full_name,
+                   (SELECT name FROM users WHERE id = NEW.user_id),
+                   (SELECT name FROM specializations WHERE id = NEW.specialization_id);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS doctor_search_ad AFTER DELETE ON doctor_profiles BEGIN
+            DELETE FROM doctor_search WHERE rowid = OLD.id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS doctor_search_user_au AFTER UPDATE OF name ON users BEGIN
+            UPDATE doctor_search SET user_name = NEW.name
+            WHERE rowid IN (SELECT id FROM doctor_profiles WHERE user_id = NEW.id);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS doctor_search_spec_au AFTER UPDATE OF name ON specializations BEGIN
+            UPDATE doctor_search SET specialization = NEW.name
+            WHERE rowid IN (SELECT id FROM doctor_profiles WHERE specialization_id = NEW.id);
+        END
+        """
+    )
+
+    op.execute("DELETE FROM doctor_search")
+    op.execute(
+        """
+        INSERT INTO doctor_search (rowid, full_name, user_name, specialization)
+        SELECT d.id, d.full_name, u.name, s.name
+        FROM doctor_profiles d
+        LEFT JOIN users u ON u.id = d.user_id
+        LEFT JOIN specializations s ON s.id = d.specialization_id
+        """
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS doctor_search")
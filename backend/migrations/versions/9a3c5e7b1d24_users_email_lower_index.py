@@ -0,0 +1,70 @@
+"""unique case-insensitive login lookup index
+
+Revision ID: 9a3c5e7b1d24
+Revises: 4d8f2b6a9e13
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3c5e7b1d24'
+down_revision = '4d8f2b6a9e13'
+branch_labels = None
+depends_on = None
+
+
+def _existing_index(bind):
+    """The current ix_users_email_lower as {"unique": bool}, or None."""
+    if bind.dialect.name == "sqlite":
+        # SQLite reflection skips expression indexes; read the DDL instead.
+        sql = bind.execute(
+            sa.text(
+                "SELECT sql FROM sqlite_master "
+                "WHERE type = 'index' AND name = 'ix_users_email_lower'"
+            )
+        ).scalar()
+        return None if sql is None else {"unique": sql.upper().startswith("CREATE UNIQUE")}
+
+    for ix in sa.inspect(bind).get_indexes("users"):
+        if ix["name"] == "ix_users_email_lower":
+            return ix
+    return None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    existing = _existing_index(bind)
+    if existing and existing["unique"]:
+        return
+
+    duplicates = bind.execute(
+        sa.text(
+            """
+            SELECT lower(email), COUNT(*) FROM users
+            GROUP BY lower(email)
+            HAVING COUNT(*) > 1
+            """
+        )
+    ).all()
+    if duplicates:
+        listing = ", ".join(f"{email} ({count})" for email, count in duplicates)
+        raise RuntimeError(
+            "These emails belong to several accounts that differ only by "
+            f"case: {listing}. Merge or rename them before applying this "
+            "migration."
+        )
+
+    if existing:
+        op.drop_index("ix_users_email_lower", table_name="users")
+
+    op.create_index(
+        "ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_users_email_lower", table_name="users")
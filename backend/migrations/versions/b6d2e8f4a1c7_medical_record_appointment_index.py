@@ -0,0 +1,35 @@
+"""medical_records.appointment_id index
+
+Revision ID: b6d2e8f4a1c7
+Revises: 9a3c5e7b1d24
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2e8f4a1c7'
+down_revision = '9a3c5e7b1d24'
+branch_labels = None
+depends_on = None
+
+
+NAME = "ix_medical_records_appointment_id"
+
+
+def _exists():
+    inspector = sa.inspect(op.get_bind())
+    return NAME in {ix["name"] for ix in inspector.get_indexes("medical_records")}
+
+
+def upgrade():
+    # Databases bootstrapped with db.create_all() already carry the index.
+    if not _exists():
+        op.create_index(NAME, "medical_records", ["appointment_id"])
+
+
+def downgrade():
+    if _exists():
+        op.drop_index(NAME, table_name="medical_records")
@@ -0,0 +1,71 @@
+"""unique active appointment per doctor slot
+
+Revision ID: c7d93e5a1f42
+Revises: 8b4e61d0c2a5
+Create Date: 2026-10-18 19:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d93e5a1f42'
+down_revision = '8b4e61d0c2a5'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE = sa.text("status != 'CANCELLED'")
+
+
+def _has_index():
+    inspector = sa.inspect(op.get_bind())
+    return any(
+        ix["name"] == "uq_appointments_active_slot"
+        for ix in inspector.get_indexes("appointments")
+    )
+
+
+def upgrade():
+    # Partial unique indexes need SQLite or PostgreSQL.
+    if op.get_bind().dialect.name not in ("sqlite", "postgresql"):
+        return
+
+    # Databases bootstrapped with db.create_all() already carry the index.
+    if _has_index():
+        return
+
+    duplicates = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM appointments
+                WHERE status != 'CANCELLED'
+                GROUP BY doctor_id, date, time
+                HAVING COUNT(*) > 1
+            ) AS d
+            """
+        )
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} doctor slot(s) are double booked; cancel the extra "
+            "appointments before applying this migration."
+        )
+
+    op.create_index(
+        "uq_appointments_active_slot",
+        "appointments",
+        ["doctor_id", "date", "time"],
+        unique=True,
+        sqlite_where=ACTIVE,
+        postgresql_where=ACTIVE,
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name not in ("sqlite", "postgresql") or not _has_index():
+        return
+
+    op.drop_index("uq_appointments_active_slot", table_name="appointments")
@@ -0,0 +1,77 @@
+"""unique active appointment per doctor slot on MySQL
+
+Revision ID: d3f7a9c1e5b8
+Revises: b6d2e8f4a1c7
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f7a9c1e5b8'
+down_revision = 'b6d2e8f4a1c7'
+branch_labels = None
+depends_on = None
+
+
+NAME = "uq_appointments_active_slot"
+
+# c7d93e5a1f42 covers SQLite and PostgreSQL with a partial index. MySQL has
+# none, so the index gets a key part that is NULL for cancelled rows; NULLs
+# never collide. Functional key parts need MySQL 8.0.13+.
+ACTIVE_SLOT = "(CASE WHEN status != 'CANCELLED' THEN 1 END)"
+
+
+def _has_index():
+    bind = op.get_bind()
+    return bind.execute(
+        sa.text(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'appointments' "
+            "AND index_name = :name"
+        ),
+        {"name": NAME},
+    ).scalar() > 0
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "mysql":
+        return
+
+    # Databases bootstrapped with db.create_all() already carry the index.
+    if _has_index():
+        return
+
+    duplicates = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM appointments
+                WHERE status != 'CANCELLED'
+                GROUP BY doctor_id, date, time
+                HAVING COUNT(*) > 1
+            ) AS d
+            """
+        )
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} doctor slot(s) are double booked; cancel the extra "
+            "appointments before applying this migration."
+        )
+
+    op.create_index(
+        NAME,
+        "appointments",
+        ["doctor_id", "date", "time", sa.text(ACTIVE_SLOT)],
+        unique=True,
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "mysql" or not _has_index():
+        return
+
+    op.drop_index(NAME, table_name="appointments")
@@ -0,0 +1,43 @@
+"""recurring weekly doctor schedule
+
+Revision ID: e2a5f7c81b36
+Revises: c7d93e5a1f42
+Create Date: 2026-10-18 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a5f7c81b36'
+down_revision = 'c7d93e5a1f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases bootstrapped with db.create_all() already have the table.
+    if sa.inspect(op.get_bind()).has_table("doctor_weekly_schedule"):
+        return
+
+    op.create_table(
+        "doctor_weekly_schedule",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("doctor_id", sa.Integer(), nullable=False),
+        sa.Column("weekday", sa.Integer(), nullable=False),
+        sa.Column("slot_type", sa.String(length=20), nullable=False),
+        sa.Column("is_available", sa.Boolean(), nullable=True),
+        sa.Column("start_time", sa.Time(), nullable=True),
+        sa.Column("end_time", sa.Time(), nullable=True),
+        sa.ForeignKeyConstraint(["doctor_id"], ["doctor_profiles.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "doctor_id", "weekday", "slot_type",
+            name="uq_doctor_weekly_schedule_doctor_weekday_slot",
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("doctor_weekly_schedule")
@@ -8,8 +8,10 @@ from .patient import PatientProfile
 from .doctor import DoctorProfile
 from .specialization import Specialization
 from .doctor_availability import DoctorAvailability
+from .doctor_schedule import DoctorWeeklySchedule
 from .appointment import Appointment, AppointmentStatus
 from .medical_record import MedicalRecord
+from .email_outbox import EmailOutbox, EmailStatus
 
 __all__ = [
     "db",
@@ -19,9 +21,12 @@ __all__ = [
     "DoctorProfile",
     "Specialization",
     "DoctorAvailability",
+    "DoctorWeeklySchedule",
     "Appointment",
     "AppointmentStatus",
     "Treatment",
     "Prescription",
     "MedicalRecord",
+    "EmailOutbox",
+    "EmailStatus",
 ]
@@ -12,6 +12,27 @@ class AppointmentStatus(enum.Enum):
 
 class Appointment(db.Model):
     __tablename__ = "appointments"
+    __table_args__ = (
+        db.Index("ix_appointments_doctor_date_time", "doctor_id", "date", "time"),
+        db.Index("ix_appointments_patient_date", "patient_id", "date"),
+        # At most one live booking per doctor slot; cancelled rows are free.
+        db.Index(
+            "uq_appointments_active_slot",
+            "doctor_id", "date", "time",
+            unique=True,
+            sqlite_where=db.text("status != 'CANCELLED'"),
+            postgresql_where=db.text("status != 'CANCELLED'"),
+        ).ddl_if(dialect=("sqlite", "postgresql")),
+        # MySQL has no partial indexes. The expression is NULL for cancelled
+        # rows and NULLs never collide, so this indexes the same rule
+        # (functional key parts need MySQL 8.0.13+).
+        db.Index(
+            "uq_appointments_active_slot",
+            "doctor_id", "date", "time",
+            db.text("(CASE WHEN status != 'CANCELLED' THEN 1 END)"),
+            unique=True,
+        ).ddl_if(dialect="mysql"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
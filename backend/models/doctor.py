@@ -31,6 +31,12 @@ class DoctorProfile(db.Model):
         cascade="all, delete-orphan"
     )
 
+    weekly_schedule = db.relationship(
+        "DoctorWeeklySchedule",
+        back_populates="doctor",
+        cascade="all, delete-orphan"
+    )
+
     appointments = db.relationship(
         "Appointment",
         back_populates="doctor",
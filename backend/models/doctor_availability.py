@@ -4,6 +4,13 @@ from datetime import date, time
 
 class DoctorAvailability(db.Model):
     __tablename__ = "doctor_daily_availability"
+    __table_args__ = (
+        db.Index(
+            "uq_doctor_availability_doctor_date_slot",
+            "doctor_id", "date", "slot_type",
+            unique=True,
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     doctor_id = db.Column(db.Integer, db.ForeignKey(
@@ -0,0 +1,34 @@
+from database import db
+
+
+class DoctorWeeklySchedule(db.Model):
+    """
+    Recurring weekly availability. A DoctorAvailability row for a specific
+    date and slot_type overrides the template for that day.
+    """
+    __tablename__ = "doctor_weekly_schedule"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "doctor_id", "weekday", "slot_type",
+            name="uq_doctor_weekly_schedule_doctor_weekday_slot",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    doctor_id = db.Column(db.Integer, db.ForeignKey(
+        "doctor_profiles.id"), nullable=False)
+
+    # Monday == 0 ... Sunday == 6, as in date.weekday()
+    weekday = db.Column(db.Integer, nullable=False)
+
+    slot_type = db.Column(db.String(20), nullable=False)
+
+    is_available = db.Column(db.Boolean, default=True)
+
+    start_time = db.Column(db.Time, nullable=True)
+    end_time = db.Column(db.Time, nullable=True)
+
+    doctor = db.relationship("DoctorProfile", back_populates="weekly_schedule")
+
+    def __repr__(self):
+        return f"<WeeklySchedule {self.weekday} {self.slot_type}>"
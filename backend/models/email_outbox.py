@@ -0,0 +1,44 @@
+from database import db
+import enum
+from datetime import datetime
+
+
+class EmailStatus(enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # JSON lists of addresses
+    recipients = db.Column(db.Text, nullable=False)
+    cc = db.Column(db.Text)
+    bcc = db.Column(db.Text)
+
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    # JSON list of {"filename", "mime", "data" (base64)}
+    attachments = db.Column(db.Text)
+
+    status = db.Column(db.Enum(EmailStatus),
+                       default=EmailStatus.PENDING, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+
+    # when a PENDING row may be tried, or when a SENDING claim expires
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.status}>"
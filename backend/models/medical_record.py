@@ -4,6 +4,10 @@ from datetime import datetime
 
 class MedicalRecord(db.Model):
     __tablename__ = "medical_records"
+    __table_args__ = (
+        # Every history and export joins records to their appointments.
+        db.Index("ix_medical_records_appointment_id", "appointment_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     appointment_id = db.Column(db.Integer, db.ForeignKey(
@@ -27,3 +27,8 @@ class User(db.Model):
 
     def __repr__(self):
         return f"<User {self.email}>"
+
+
+# Login looks users up by lower(email); unique so two accounts can't differ
+# only by case.
+db.Index("ix_users_email_lower", db.func.lower(User.email), unique=True)
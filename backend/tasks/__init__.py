@@ -1,3 +1,4 @@
 from . import scheduled_jobs  
 from . import background_jobs  
+from . import email_jobs
 from .task_logger import *
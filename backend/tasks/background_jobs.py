@@ -1,18 +1,93 @@
 
 
 import csv
-import io
+import gzip
+import os
+import tempfile
+
+from flask import current_app
+from sqlalchemy import select
 
 from .celery_app import celery
+from .task_logger import save_log
 from database import get_db_session
-from models import Appointment, PatientProfile, MedicalRecord
-from utils.notifications import send_email
+from models import Appointment, DoctorProfile, PatientProfile, MedicalRecord
+from utils.notifications import queue_email
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def write_treatments_csv_gz(session, patient, chunk_size=EXPORT_CHUNK_SIZE, progress=None,
+                            directory=None):
+    """
+    Stream the patient's treatment history into a gzip-compressed CSV temp
+    file (in `directory`, default the system temp dir) and return
+    (path, rows_written); the caller removes the file. Rows
+    come from one joined query fetched `chunk_size` at a time, so memory
+    stays bounded however long the history is. `progress(rows_written)` is
+    called after every chunk.
+    """
+    record_columns = [col.name for col in MedicalRecord.__table__.columns]
 
+    rows = session.execute(
+        select(
+            DoctorProfile.full_name,
+            Appointment.date,
+            Appointment.time,
+            *[getattr(MedicalRecord, col) for col in record_columns],
+        )
+        .select_from(Appointment)
+        .join(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
+        .outerjoin(DoctorProfile, Appointment.doctor_id == DoctorProfile.id)
+        .where(Appointment.patient_id == patient.id)
+        .order_by(Appointment.date.asc(), Appointment.time.asc())
+        .execution_options(yield_per=chunk_size)
+    )
 
-@celery.task(name="tasks.export_patient_treatments_csv")
-def export_patient_treatments_csv(patient_user_id: int):
+    fd, path = tempfile.mkstemp(prefix="treatments_", suffix=".csv.gz", dir=directory)
+    os.close(fd)
+
+    user = patient.user
+    written = 0
+    try:
+        with gzip.open(path, "wt", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+
+            writer.writerow(
+                ["patient_user_id", "patient_name", "doctor_name", "date", "time"]
+                + record_columns
+            )
+
+            for chunk in rows.partitions():
+                writer.writerows(
+                    [user.id, user.name, doctor_name or "", d.isoformat(), t.strftime("%H:%M")]
+                    + list(record)
+                    for doctor_name, d, t, *record in chunk
+                )
+                written += len(chunk)
+                if progress:
+                    progress(written)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return path, written
+
+
+@celery.task(name="tasks.export_patient_treatments_csv", bind=True)
+def export_patient_treatments_csv(self, patient_user_id: int):
+    task_id = self.request.id
     session = get_db_session()
 
+    def report(stage, rows_written=0):
+        save_log(task_id, "PROGRESS", {
+            "task": self.name,
+            "stage": stage,
+            "rows_written": rows_written,
+        })
+
+    report("querying")
+
     patient = (
         session.query(PatientProfile)
         .filter_by(user_id=patient_user_id)
@@ -22,40 +97,15 @@ def export_patient_treatments_csv(patient_user_id: int):
     if not patient or not patient.user or not patient.user.email:
         return "Patient/email not found"
 
-    appts = (
-        session.query(Appointment)
-        .join(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
-        .filter(Appointment.patient_id == patient.id)
-        .order_by(Appointment.date.asc(), Appointment.time.asc())
-        .all()
-    )
-
-    record_columns = [col.name for col in MedicalRecord.__table__.columns]
-
-    output = io.StringIO()
-    writer = csv.writer(output)
+    # The file is handed to the outbox by path, which removes it once sent.
+    attachment_dir = current_app.config["EMAIL_ATTACHMENT_DIR"]
+    os.makedirs(attachment_dir, exist_ok=True)
 
-    writer.writerow(
-        ["patient_user_id", "patient_name", "doctor_name", "date", "time"]
-        + record_columns
+    path, written = write_treatments_csv_gz(
+        session, patient, progress=lambda n: report("writing", n),
+        directory=attachment_dir,
     )
-
-    for a in appts:
-        record = a.medical_record
-
-        writer.writerow(
-            [
-                patient.user.id,
-                patient.user.name,
-                a.doctor.full_name if a.doctor else "",
-                a.date.isoformat(),
-                a.time.strftime("%H:%M"),
-            ]
-            + [getattr(record, col) for col in record_columns]
-        )
-
-    csv_bytes = output.getvalue().encode("utf-8")
-    output.close()
+    report("emailing", written)
 
     email_html = f"""
         <p>Hello {patient.user.name},</p>
@@ -63,8 +113,9 @@ def export_patient_treatments_csv(patient_user_id: int):
         <p>Your complete treatment history has been exported successfully.</p>
 
         <p>
-            The CSV file containing all your medical records is attached to this email.  
-            You can download it and open it in Excel, Google Sheets, or any compatible software.
+            The CSV file containing all your medical records is attached to this email
+            as a gzip archive. Extract it, then open it in Excel, Google Sheets, or any
+            compatible software.
         </p>
 
         <p>If you did not request this export, please contact support immediately.</p>
@@ -73,11 +124,16 @@ def export_patient_treatments_csv(patient_user_id: int):
         <p>Regards,<br><strong>Smart Hospital</strong></p>
     """
 
-    send_email(
-        to=patient.user.email,
-        subject="Your Treatment History – CSV Export",
-        body=email_html,
-        attachments=[("treatment_records.csv", csv_bytes, "text/csv")],
-    )
+    try:
+        queue_email(
+            to=patient.user.email,
+            subject="Your Treatment History – CSV Export",
+            body=email_html,
+            file_attachments=[("treatment_records.csv.gz", path, "application/gzip")],
+        )
+        session.commit()
+    except BaseException:
+        os.remove(path)
+        raise
 
-    return "Export complete"
+    return f"Export complete ({written} rows)"
@@ -1,16 +1,63 @@
 
 
-from celery import Celery
+from celery import Celery, Task
 import os
 from celery.schedules import crontab
+from celery.signals import celeryd_init, task_postrun
+from kombu import Queue
 
 CELERY_BROKER = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-CELERY_BACKEND = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CELERY_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER)
+
+
+def queue_settings(queue, concurrency, prefetch, acks_late):
+    """Worker settings for one queue, overridable as CELERY_<QUEUE>_*."""
+    prefix = f"CELERY_{queue.upper()}_"
+    return {
+        "concurrency": int(os.getenv(prefix + "CONCURRENCY", concurrency)),
+        "prefetch": int(os.getenv(prefix + "PREFETCH", prefetch)),
+        "acks_late": os.getenv(prefix + "ACKS_LATE", str(acks_late)).lower()
+        in ("1", "true", "yes"),
+    }
+
+
+# One worker pool per queue, started with `-Q <queue>`, so a burst on one
+# (a month of reports, a pile of exports) can't hold up the others.
+# Long-running queues prefetch a single task; everything but the default
+# queue acks late, since those tasks are safe to run again.
+WORKER_QUEUES = {
+    "default": queue_settings("default", 2, 4, False),
+    "reminders": queue_settings("reminders", 4, 1, True),
+    "email": queue_settings("email", 2, 1, True),
+    "exports": queue_settings("exports", 2, 1, True),
+    "reports": queue_settings("reports", 2, 1, True),
+}
+
+TASK_QUEUES = {
+    "tasks.daily_appointment_reminder": "reminders",
+    "tasks.send_reminder_chunk": "reminders",
+    "tasks.summarize_reminders": "reminders",
+    "tasks.deliver_email_outbox": "email",
+    "tasks.export_patient_treatments_csv": "exports",
+    "tasks.monthly_doctor_report": "reports",
+    "tasks.send_doctor_report": "reports",
+}
+
+class AppContextTask(Task):
+    """Run tasks inside the Flask app context (mail, db session setup)."""
+
+    def __call__(self, *args, **kwargs):
+        from app import app
+
+        with app.app_context():
+            return self.run(*args, **kwargs)
+
 
 celery = Celery(
     "hospital_app",
     broker=CELERY_BROKER,
     backend=CELERY_BACKEND,
+    task_cls=AppContextTask,
 )
 
 celery.conf.update(
@@ -20,8 +67,19 @@ celery.conf.update(
     task_track_started=True,
     task_send_sent_event=True,
 
-    result_backend="redis://localhost:6379/1",
-    broker_url="redis://localhost:6379/0",
+    task_queues=[Queue(name) for name in WORKER_QUEUES],
+    task_default_queue="default",
+    task_routes={name: {"queue": queue} for name, queue in TASK_QUEUES.items()},
+    task_annotations={
+        name: {"acks_late": WORKER_QUEUES[queue]["acks_late"]}
+        for name, queue in TASK_QUEUES.items()
+    },
+    task_reject_on_worker_lost=True,
+    # Unacked tasks are redelivered after this long, so it must outlast
+    # the slowest acks_late task.
+    broker_transport_options={
+        "visibility_timeout": int(os.getenv("CELERY_VISIBILITY_TIMEOUT", 60 * 60)),
+    },
 
     task_ignore_result=False,
     worker_send_task_events=True,
@@ -29,8 +87,6 @@ celery.conf.update(
     result_serializer="json",
 
     beat_scheduler="celery.beat.PersistentScheduler",
-
-    beat_schedule={...}
 )
 
 
@@ -48,4 +104,38 @@ celery.conf.beat_schedule = {
         "task": "tasks.monthly_doctor_report",
         "schedule": crontab(hour=8, minute=0, day_of_month="1"),
     },
+
+
+    "deliver-email-outbox": {
+
+        "task": "tasks.deliver_email_outbox",
+        "schedule": 10.0,
+    },
 }
+
+
+@celeryd_init.connect
+def configure_worker_pool(conf=None, options=None, **kwargs):
+    """
+    Size a worker from WORKER_QUEUES when it consumes a single queue
+    (`celery -A tasks.celery_app worker -Q exports`). Explicit -c and
+    --prefetch-multiplier flags still win.
+    """
+    queues = (options or {}).get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    queues = [q.strip() for q in queues if q.strip()]
+
+    if len(queues) != 1 or queues[0] not in WORKER_QUEUES:
+        return
+
+    settings = WORKER_QUEUES[queues[0]]
+    conf.worker_concurrency = settings["concurrency"]
+    conf.worker_prefetch_multiplier = settings["prefetch"]
+
+
+@task_postrun.connect
+def release_db_session(**kwargs):
+    from database import remove_db_session
+
+    remove_db_session()
@@ -0,0 +1,139 @@
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from .celery_app import celery
+from database import get_db_session
+from models import EmailOutbox, EmailStatus
+from utils.notifications import email_connection, outbox_message, remove_outbox_files
+
+
+# A SENDING row whose worker died is picked up again once its claim expires.
+# The claim covers the paced send time of the whole batch plus this margin.
+OUTBOX_CLAIM_MARGIN = timedelta(minutes=10)
+
+
+def claim_lease(batch_size, rate):
+    """How long a claimed batch stays reserved: its paced send time plus margin."""
+    sending = timedelta(seconds=batch_size / rate) if rate > 0 else timedelta(0)
+    return sending + OUTBOX_CLAIM_MARGIN
+
+
+def claim_outbox_batch(session, limit, lease=OUTBOX_CLAIM_MARGIN, now=None):
+    """
+    Mark up to `limit` due rows as SENDING for `lease` and return them. The
+    UPDATE only matches rows that are still due, so two workers racing for
+    the same ids each end up with a disjoint set.
+    """
+    now = now or datetime.utcnow()
+    lease_until = now + lease
+
+    due = (
+        EmailOutbox.status.in_([EmailStatus.PENDING, EmailStatus.SENDING]),
+        EmailOutbox.next_attempt_at <= now,
+    )
+
+    ids = session.scalars(
+        select(EmailOutbox.id)
+        .where(*due)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+    ).all()
+    if not ids:
+        return []
+
+    session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(ids), *due)
+        .values(status=EmailStatus.SENDING, next_attempt_at=lease_until)
+    )
+    session.commit()
+
+    return session.scalars(
+        select(EmailOutbox)
+        .where(
+            EmailOutbox.id.in_(ids),
+            EmailOutbox.status == EmailStatus.SENDING,
+            EmailOutbox.next_attempt_at == lease_until,
+        )
+        .order_by(EmailOutbox.id)
+    ).all()
+
+
+def record_failure(row, error, max_attempts, backoff):
+    """Schedule a retry with exponential backoff, or dead-letter the row."""
+    row.attempts += 1
+    row.last_error = str(error)[:1000]
+
+    if row.attempts >= max_attempts:
+        row.status = EmailStatus.DEAD
+    else:
+        row.status = EmailStatus.PENDING
+        row.next_attempt_at = datetime.utcnow() + timedelta(
+            seconds=backoff * 2 ** (row.attempts - 1)
+        )
+
+
+@celery.task(name="tasks.deliver_email_outbox")
+def deliver_email_outbox(batch_size=None):
+    """
+    Send one batch of due outbox emails over a single SMTP connection,
+    paced to EMAIL_SEND_RATE. A full batch re-queues the task so a backlog
+    drains without waiting for the next beat tick.
+    """
+    config = current_app.config
+    batch_size = batch_size or config["EMAIL_OUTBOX_BATCH_SIZE"]
+    rate = config["EMAIL_SEND_RATE"]
+    max_attempts = config["EMAIL_MAX_ATTEMPTS"]
+    backoff = config["EMAIL_RETRY_BACKOFF"]
+
+    session = get_db_session()
+    rows = claim_outbox_batch(session, batch_size, claim_lease(batch_size, rate))
+    if not rows:
+        return {"sent": 0, "retry": 0, "dead": 0}
+
+    interval = 1.0 / rate if rate > 0 else 0
+    started = time.monotonic()
+    sent = 0
+
+    try:
+        with email_connection() as conn:
+            for i, row in enumerate(rows):
+                if interval:
+                    delay = started + i * interval - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                try:
+                    conn.send(outbox_message(row))
+                except Exception as e:
+                    record_failure(row, e, max_attempts, backoff)
+                else:
+                    row.status = EmailStatus.SENT
+                    row.sent_at = datetime.utcnow()
+                    row.last_error = None
+                    sent += 1
+
+                # Commit per message so a crash cannot resend what went out.
+                session.commit()
+                if row.status != EmailStatus.PENDING:
+                    remove_outbox_files(row)
+
+    except Exception as e:
+        # Connecting (or closing) failed: every row not yet sent is retried.
+        failed = [row for row in rows if row.status == EmailStatus.SENDING]
+        for row in failed:
+            record_failure(row, e, max_attempts, backoff)
+        session.commit()
+        for row in failed:
+            if row.status == EmailStatus.DEAD:
+                remove_outbox_files(row)
+
+    dead = sum(1 for row in rows if row.status == EmailStatus.DEAD)
+
+    if len(rows) == batch_size:
+        deliver_email_outbox.delay(batch_size)
+
+    return {"sent": sent, "retry": len(rows) - sent - dead, "dead": dead}
@@ -1,8 +1,17 @@
 
 
+import smtplib
 from datetime import date, datetime, timedelta
 
+from itertools import groupby
+from uuid import uuid4
+
+from celery import chord, group
+from sqlalchemy import and_
+from sqlalchemy.orm import aliased
+
 from .celery_app import celery
+from cache.redis_client import redis_client
 from database import get_db_session
 from models import (
     Appointment,
@@ -10,8 +19,23 @@ from models import (
     PatientProfile,
     DoctorProfile,
     MedicalRecord,
+    User,
 )
-from utils.notifications import send_email
+from utils.notifications import build_message, email_connection, queue_email
+
+
+REMINDER_CHUNK_SIZE = 50
+REMINDER_MARKER_TTL = 60 * 60 * 48
+# Long enough for one send; a claim outliving its worker blocks nobody for long.
+REMINDER_CLAIM_TTL = 60 * 5
+
+
+def reminder_marker_key(day):
+    return f"reminders:sent:{day}"
+
+
+def reminder_claim_key(day, appointment_id):
+    return f"reminders:sending:{day}:{appointment_id}"
 
 
 @celery.task(name="tasks.daily_appointment_reminder")
@@ -20,32 +44,127 @@ def send_daily_appointment_reminders():
 
     today = date.today()
 
-    appts = (
-        session.query(Appointment)
+    rows = (
+        session.query(
+            Appointment.id,
+            Appointment.time,
+            User.name,
+            User.email,
+            DoctorProfile.full_name,
+        )
+        .join(PatientProfile, Appointment.patient_id == PatientProfile.id)
+        .join(User, PatientProfile.user_id == User.id)
+        .outerjoin(DoctorProfile, Appointment.doctor_id == DoctorProfile.id)
         .filter(Appointment.date == today)
         .filter(Appointment.status != AppointmentStatus.CANCELLED)
+        .order_by(Appointment.time.asc())
         .all()
     )
 
-    for a in appts:
-        if not a.patient or not a.patient.user or not a.patient.user.email:
-            continue
+    reminders = [
+        {
+            "appointment_id": appt_id,
+            "patient_name": name,
+            "email": email,
+            "doctor_name": doctor_name or "",
+            "date": today.isoformat(),
+            "time": appt_time.strftime("%H:%M"),
+        }
+        for appt_id, appt_time, name, email, doctor_name in rows
+        if email
+    ]
+    skipped = len(rows) - len(reminders)
+
+    if not reminders:
+        return summarize_reminders([], skipped=skipped)
+
+    chunks = [
+        reminders[i:i + REMINDER_CHUNK_SIZE]
+        for i in range(0, len(reminders), REMINDER_CHUNK_SIZE)
+    ]
+
+    result = chord(
+        send_reminder_chunk.s(chunk) for chunk in chunks
+    )(summarize_reminders.s(skipped=skipped))
+
+    return f"Dispatched {len(reminders)} reminders in {len(chunks)} chunks ({result.id})"
+
+
+@celery.task(name="tasks.send_reminder_chunk", bind=True)
+def send_reminder_chunk(self, reminders):
+    """
+    Send one chunk of reminders over a single SMTP connection.
+
+    An appointment is marked as reminded only once its send succeeds, so
+    reruns of the day's job skip it. While sending, a short-lived claim
+    keyed to this task keeps a concurrent run from sending it twice; a
+    redelivery of this same task (the worker died mid-chunk) takes its
+    own claims back instead of skipping them.
+
+    If the SMTP connection fails, every unsent reminder in the chunk is
+    counted as failed and the chunk still returns its counts so
+    summarize_reminders runs. Redis errors are not caught.
+    """
+    counts = {"sent": 0, "failed": 0, "skipped": 0}
+    owner = self.request.id or uuid4().hex
+    claim = None
+
+    try:
+        with email_connection() as conn:
+            for r in reminders:
+                marker = reminder_marker_key(r["date"])
+
+                if redis_client.sismember(marker, r["appointment_id"]):
+                    counts["skipped"] += 1
+                    continue
+
+                claim = reminder_claim_key(r["date"], r["appointment_id"])
+                if not redis_client.set(claim, owner, nx=True, ex=REMINDER_CLAIM_TTL):
+                    if redis_client.get(claim) != owner:
+                        claim = None
+                        counts["skipped"] += 1
+                        continue
 
-        subject = "Appointment Reminder"
-        body = f"""
-        <p>Dear {a.patient.user.name},</p>
-        <p>This is a reminder for your appointment today.</p>
-        <ul>
-            <li><strong>Doctor:</strong> {a.doctor.full_name}</li>
-            <li><strong>Time:</strong> {a.time.strftime("%H:%M")}</li>
-            <li><strong>Date:</strong> {a.date.isoformat()}</li>
-        </ul>
-        <p>Please reach 10 minutes early.</p>
-        """
+                body = f"""
+                <p>Dear {r["patient_name"]},</p>
+                <p>This is a reminder for your appointment today.</p>
+                <ul>
+                    <li><strong>Doctor:</strong> {r["doctor_name"]}</li>
+                    <li><strong>Time:</strong> {r["time"]}</li>
+                    <li><strong>Date:</strong> {r["date"]}</li>
+                </ul>
+                <p>Please reach 10 minutes early.</p>
+                """
 
-        send_email(a.patient.user.email, subject, body)
+                try:
+                    conn.send(build_message(r["email"], "Appointment Reminder", body))
+                except Exception:
+                    counts["failed"] += 1
+                else:
+                    redis_client.sadd(marker, r["appointment_id"])
+                    redis_client.expire(marker, REMINDER_MARKER_TTL)
+                    counts["sent"] += 1
 
-    return f"Sent reminders for {len(appts)} appointments"
+                redis_client.delete(claim)
+                claim = None
+
+    except (smtplib.SMTPException, OSError):
+        # Connecting failed (or the connection dropped while closing):
+        # whatever was not sent is failed, and a rerun retries it.
+        if claim:
+            redis_client.delete(claim)
+        counts["failed"] = len(reminders) - counts["sent"] - counts["skipped"]
+
+    return counts
+
+
+@celery.task(name="tasks.summarize_reminders")
+def summarize_reminders(chunk_counts, skipped=0):
+    totals = {"sent": 0, "failed": 0, "skipped": skipped}
+    for counts in chunk_counts:
+        for key in totals:
+            totals[key] += counts.get(key, 0)
+    return totals
 
 
 @celery.task(name="tasks.monthly_doctor_report")
@@ -53,6 +172,10 @@ def send_monthly_doctor_reports():
     """
     This will be scheduled monthly via Celery beat.
     If you schedule it daily, add a guard: only run on day == 1.
+
+    All doctors' appointments for last month come from one joined query,
+    grouped here per doctor; rendering and sending fan out to one
+    send_doctor_report task per doctor.
     """
     session = get_db_session()
 
@@ -62,58 +185,125 @@ def send_monthly_doctor_reports():
     last_month_end = first_day_this_month - timedelta(days=1)
     last_month_start = last_month_end.replace(day=1)
 
-    doctors = session.query(DoctorProfile).all()
-
-    for doc in doctors:
-        if not doc.user or not doc.user.email:
-            continue
+    DoctorUser = aliased(User)
+    PatientUser = aliased(User)
 
-        appts = (
-            session.query(Appointment)
-            .filter(Appointment.doctor_id == doc.id)
-            .filter(Appointment.date >= last_month_start)
-            .filter(Appointment.date <= last_month_end)
-            .all()
+    rows = (
+        session.query(
+            DoctorProfile.id,
+            DoctorProfile.full_name,
+            DoctorUser.email,
+            Appointment.id,
+            Appointment.patient_id,
+            Appointment.date,
+            Appointment.time,
+            Appointment.status,
+            PatientUser.name,
+            MedicalRecord.diagnosis,
+            MedicalRecord.prescription,
+            MedicalRecord.notes,
         )
+        .join(DoctorUser, DoctorProfile.user_id == DoctorUser.id)
+        .outerjoin(
+            Appointment,
+            and_(
+                Appointment.doctor_id == DoctorProfile.id,
+                Appointment.date >= last_month_start,
+                Appointment.date <= last_month_end,
+            ),
+        )
+        .outerjoin(PatientProfile, Appointment.patient_id == PatientProfile.id)
+        .outerjoin(PatientUser, PatientProfile.user_id == PatientUser.id)
+        .outerjoin(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
+        .filter(DoctorUser.email.isnot(None))
+        .order_by(DoctorProfile.id, Appointment.date, Appointment.time)
+        .all()
+    )
 
-        rows = []
-        for a in appts:
+    reports = []
+    for doctor_id, doctor_rows in groupby(rows, key=lambda r: r[0]):
+        doctor_rows = list(doctor_rows)
+        _, full_name, email = doctor_rows[0][:3]
 
-            record = getattr(a, "medical_record", None) or getattr(
-                a, "treatment", None)
+        by_status = {s.value: 0 for s in AppointmentStatus}
+        patients = set()
+        report_rows = []
 
-            rows.append({
-                "patient": a.patient.user.name if a.patient and a.patient.user else "",
-                "date": a.date.isoformat(),
-                "time": a.time.strftime("%H:%M"),
-                "diagnosis": getattr(record, "diagnosis", "") if record else "",
-                "prescription": getattr(record, "prescription", "") if record else "",
-                "notes": getattr(record, "notes", "") if record else "",
+        for (_, _, _, appt_id, patient_id, d, t, status,
+             patient_name, diagnosis, prescription, notes) in doctor_rows:
+            if appt_id is None:
+                continue
+
+            by_status[(status or AppointmentStatus.PENDING).value] += 1
+            patients.add(patient_id)
+            report_rows.append({
+                "patient": patient_name or "",
+                "date": d.isoformat(),
+                "time": t.strftime("%H:%M"),
+                "diagnosis": diagnosis or "",
+                "prescription": prescription or "",
+                "notes": notes or "",
             })
 
-        html_rows = "".join(
-            f"<tr>"
-            f"<td>{r['patient']}</td>"
-            f"<td>{r['date']} {r['time']}</td>"
-            f"<td>{r['diagnosis']}</td>"
-            f"<td>{r['prescription']}</td>"
-            f"<td>{r['notes']}</td>"
-            f"</tr>"
-            for r in rows
-        )
+        reports.append({
+            "doctor_name": full_name,
+            "email": email,
+            "period_start": last_month_start.isoformat(),
+            "period_end": last_month_end.isoformat(),
+            "summary": {
+                "total": len(report_rows),
+                "by_status": by_status,
+                "completed_visits": by_status[AppointmentStatus.COMPLETED.value],
+                "distinct_patients": len(patients),
+            },
+            "rows": report_rows,
+        })
+
+    if reports:
+        group(send_doctor_report.s(report) for report in reports).apply_async()
+
+    return f"Dispatched monthly reports for {len(reports)} doctors"
+
+
+@celery.task(name="tasks.send_doctor_report")
+def send_doctor_report(report):
+    summary = report["summary"]
+
+    html_rows = "".join(
+        f"<tr>"
+        f"<td>{r['patient']}</td>"
+        f"<td>{r['date']} {r['time']}</td>"
+        f"<td>{r['diagnosis']}</td>"
+        f"<td>{r['prescription']}</td>"
+        f"<td>{r['notes']}</td>"
+        f"</tr>"
+        for r in report["rows"]
+    )
+
+    status_items = "".join(
+        f"<li>{status.capitalize()}: {count}</li>"
+        for status, count in summary["by_status"].items()
+    )
+
+    html_body = f"""
+    <h2>Monthly Activity Report for Dr. {report['doctor_name']}</h2>
+    <p>Period: {report['period_start']} → {report['period_end']}</p>
+    <ul>
+        <li><strong>Appointments:</strong> {summary['total']}</li>
+        <li><strong>Completed visits:</strong> {summary['completed_visits']}</li>
+        <li><strong>Distinct patients:</strong> {summary['distinct_patients']}</li>
+        {status_items}
+    </ul>
+    <table border='1' cellpadding='6'>
+        <tr>
+            <th>Patient</th><th>Date & Time</th>
+            <th>Diagnosis</th><th>Prescription</th><th>Notes</th>
+        </tr>
+        {html_rows}
+    </table>
+    """
+
+    queue_email(report["email"], "Monthly Activity Report", html_body)
+    get_db_session().commit()
 
-        html_body = f"""
-        <h2>Monthly Activity Report for Dr. {doc.full_name}</h2>
-        <p>Period: {last_month_start} → {last_month_end}</p>
-        <table border='1' cellpadding='6'>
-            <tr>
-                <th>Patient</th><th>Date & Time</th>
-                <th>Diagnosis</th><th>Prescription</th><th>Notes</th>
-            </tr>
-            {html_rows}
-        </table>
-        """
-
-        send_email(doc.user.email, "Monthly Activity Report", html_body)
-
-    return "Monthly doctor reports sent"
+    return summary
@@ -1,30 +1,252 @@
 import json
+import os
+import time
+import traceback as tb
+from datetime import datetime
+
 import redis
 from celery.signals import task_prerun, task_postrun, task_failure
 
-redis_client = redis.Redis(host="localhost", port=6379, db=2)
+redis_client = redis.Redis(
+    host=os.getenv("REDIS_HOST", "localhost"),
+    port=int(os.getenv("REDIS_PORT", 6379)),
+    db=2,
+    decode_responses=True,
+)
+
+# Every log expires after TASK_LOG_TTL and the indexes keep at most
+# TASK_LOG_MAX entries, so the store stays bounded however many tasks run.
+TASK_LOG_TTL = int(os.getenv("TASK_LOG_TTL", 60 * 60 * 24 * 7))
+TASK_LOG_MAX = int(os.getenv("TASK_LOG_MAX", 10000))
+# Durations kept per task name for the latency percentiles.
+TASK_DURATION_SAMPLES = int(os.getenv("TASK_DURATION_SAMPLES", 1000))
+
+TASK_INDEX = "tasklog:index"
+TASK_NAMES = "tasklog:names"
+
+
+def log_key(task_id):
+    return f"tasklog:{task_id}"
+
+
+def task_index_key(task_name):
+    return f"tasklog:index:{task_name}"
+
+
+def durations_key(task_name):
+    return f"tasklog:durations:{task_name}"
+
+
+def decode_log(data):
+    if not data:
+        return None
+
+    log = dict(data)
+    log["info"] = json.loads(log.get("info") or "{}")
+    if "duration_ms" in log:
+        log["duration_ms"] = float(log["duration_ms"])
+    if "owner_id" in log:
+        log["owner_id"] = int(log["owner_id"])
+    return log
 
 
 def save_log(task_id, status, info):
-    log = {
+    """Update a task's status and info; start/end times are left alone."""
+    key = log_key(task_id)
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping={
         "task_id": task_id,
         "status": status,
-        "info": info,
-    }
-    redis_client.set(task_id, json.dumps(log))
+        "info": json.dumps(info, default=str),
+    })
+    pipe.expire(key, TASK_LOG_TTL)
+    pipe.execute()
+
+
+def register_log(task_id, task_name, owner_id):
+    """
+    Create a PENDING log owned by `owner_id` before the task is queued, so
+    the user who started it can poll it (see get_owned_log).
+    """
+    key = log_key(task_id)
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping={
+        "task_id": task_id,
+        "task": task_name,
+        "status": "PENDING",
+        "owner_id": owner_id,
+        "info": json.dumps({"task": task_name}),
+    })
+    pipe.expire(key, TASK_LOG_TTL)
+    pipe.execute()
+
+
+def get_log(task_id):
+    return decode_log(redis_client.hgetall(log_key(task_id)))
+
+
+def get_owned_log(task_id, user_id):
+    """The task's log if `user_id` started it, else None."""
+    log = get_log(task_id)
+    if not log or log.get("owner_id") != user_id:
+        return None
+    return log
+
+
+def encode_log_cursor(score, task_id):
+    return f"{score!r}_{task_id}"
+
+
+def decode_log_cursor(cursor):
+    """(score, task_id) from a list_logs cursor; ValueError if malformed."""
+    score, task_id = cursor.split("_", 1)
+    return float(score), task_id
+
+
+def list_logs(task_name=None, status=None, limit=50, before=None):
+    """
+    Newest-first page of task logs, optionally filtered by task name and
+    status. `before` is the `next_cursor` of the previous page, decoded
+    with decode_log_cursor. Returns (items, next_cursor).
+
+    Logs are ordered by (start time, task id) descending, as the index
+    returns them, and the cursor names a position in that order: tasks
+    started at the same instant (a chord's chunks) are never skipped at a
+    page boundary.
+    """
+    index = task_index_key(task_name) if task_name else TASK_INDEX
+    items, next_cursor, expired = [], None, []
+
+    # Read from `max_score` down, skipping the first `skip` entries at
+    # exactly that score, which earlier pages already returned.
+    if before is not None:
+        max_score, after_id = before
+        tied = redis_client.zrevrangebyscore(index, max_score, max_score)
+        skip = sum(1 for task_id in tied if task_id >= after_id)
+    else:
+        max_score, skip = "+inf", 0
+
+    while len(items) < limit:
+        batch = redis_client.zrevrangebyscore(
+            index, max_score, "-inf", start=skip, num=limit * 2, withscores=True
+        )
+        if not batch:
+            break
+
+        pipe = redis_client.pipeline()
+        for task_id, _ in batch:
+            pipe.hgetall(log_key(task_id))
+        logs = pipe.execute()
+
+        for (task_id, score), data in zip(batch, logs):
+            if score == max_score:
+                skip += 1
+            else:
+                max_score, skip = score, 1
+
+            if not data:
+                expired.append(task_id)
+                continue
+            if status and data.get("status") != status:
+                continue
+
+            items.append(decode_log(data))
+            if len(items) == limit:
+                next_cursor = encode_log_cursor(score, task_id)
+                break
+
+    # Pruned only now, so the offsets above stay valid while paging.
+    if expired:
+        redis_client.zrem(index, *expired)
+
+    return items, next_cursor
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def latency_stats(task_name=None):
+    """p50/p90/p99/max duration (ms) over recent runs, per task name."""
+    names = [task_name] if task_name else sorted(redis_client.smembers(TASK_NAMES))
+
+    pipe = redis_client.pipeline()
+    for name in names:
+        pipe.lrange(durations_key(name), 0, -1)
+    samples = pipe.execute()
+
+    stats = []
+    for name, values in zip(names, samples):
+        if not values:
+            continue
+
+        values = sorted(float(v) for v in values)
+        stats.append({
+            "task": name,
+            "samples": len(values),
+            "p50_ms": percentile(values, 50),
+            "p90_ms": percentile(values, 90),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1],
+        })
+
+    return stats
 
 
 @task_prerun.connect
 def task_start_handler(sender=None, task_id=None, **kwargs):
-    save_log(task_id, "STARTED", {"task": sender.name})
+    now = time.time()
+    key = log_key(task_id)
 
-
-@task_postrun.connect
-def task_success_handler(sender=None, task_id=None, retval=None, **kwargs):
-    save_log(task_id, "SUCCESS", {
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping={
+        "task_id": task_id,
         "task": sender.name,
-        "result": retval
+        "status": "STARTED",
+        "started_at": datetime.utcfromtimestamp(now).isoformat(),
+        "started_ts": now,
+        "info": json.dumps({"task": sender.name}),
     })
+    pipe.expire(key, TASK_LOG_TTL)
+
+    pipe.sadd(TASK_NAMES, sender.name)
+    pipe.expire(TASK_NAMES, TASK_LOG_TTL)
+    for index in (TASK_INDEX, task_index_key(sender.name)):
+        pipe.zadd(index, {task_id: now})
+        pipe.zremrangebyrank(index, 0, -TASK_LOG_MAX - 1)
+        pipe.zremrangebyscore(index, "-inf", now - TASK_LOG_TTL)
+        pipe.expire(index, TASK_LOG_TTL)
+    pipe.execute()
+
+
+@task_postrun.connect
+def task_success_handler(sender=None, task_id=None, retval=None, state=None, **kwargs):
+    now = time.time()
+    key = log_key(task_id)
+    started = redis_client.hget(key, "started_ts")
+    duration_ms = round((now - float(started)) * 1000, 2) if started else None
+
+    fields = {"ended_at": datetime.utcfromtimestamp(now).isoformat()}
+    if duration_ms is not None:
+        fields["duration_ms"] = duration_ms
+    if state == "SUCCESS":
+        # task_failure already recorded FAILED with the error details
+        fields["status"] = "SUCCESS"
+        fields["info"] = json.dumps({"task": sender.name, "result": retval}, default=str)
+    elif state and state != "FAILURE":
+        fields["status"] = state
+
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping=fields)
+    pipe.expire(key, TASK_LOG_TTL)
+    if duration_ms is not None:
+        samples = durations_key(sender.name)
+        pipe.lpush(samples, duration_ms)
+        pipe.ltrim(samples, 0, TASK_DURATION_SAMPLES - 1)
+        pipe.expire(samples, TASK_LOG_TTL)
+    pipe.execute()
 
 
 @task_failure.connect
@@ -32,5 +254,5 @@ def task_failure_handler(sender=None, task_id=None, exception=None, traceback=No
     save_log(task_id, "FAILED", {
         "task": sender.name,
         "error": str(exception),
-        "traceback": traceback
+        "traceback": "".join(tb.format_tb(traceback)) if traceback else None,
     })
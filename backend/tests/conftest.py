@@ -0,0 +1,196 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import time
+
+import pytest
+
+# The app reads its database URL and connects to Redis at import time, so
+# both are pointed at throwaway stores before anything imports it.
+_db_dir = tempfile.mkdtemp(prefix="hms-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_db_dir, "test.db")
+os.environ["EMAIL_ATTACHMENT_DIR"] = os.path.join(_db_dir, "attachments")
+
+fakeredis = pytest.importorskip("fakeredis")
+import redis  # noqa: E402
+
+_redis_server = fakeredis.FakeServer()
+
+
+class _FakeRedis(fakeredis.FakeStrictRedis):
+    def __init__(self, *args, **kwargs):
+        kwargs.pop("host", None)
+        kwargs.pop("port", None)
+        super().__init__(*args, server=_redis_server, **kwargs)
+
+
+redis.Redis = redis.StrictRedis = _FakeRedis
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import app as flask_app  # noqa: E402
+import database  # noqa: E402
+from database import db, get_db_session, remove_db_session  # noqa: E402
+from models import (  # noqa: E402
+    DoctorAvailability,
+    DoctorProfile,
+    PatientProfile,
+    Specialization,
+    User,
+    UserRole,
+)
+from utils.auth import profile_claims  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app():
+    return flask_app
+
+
+@pytest.fixture(autouse=True)
+def clean_state(app):
+    yield
+
+    remove_db_session()
+    with app.app_context():
+        session = get_db_session()
+        for table in reversed(db.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        remove_db_session()
+    _FakeRedis().flushall()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def session(app):
+    """
+    A session of the test's own for setting up data. It is separate from
+    the scoped session requests use, which every app context teardown
+    removes.
+    """
+    session = database.Session.session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def specialization(session):
+    spec = Specialization(name="Cardiology")
+    session.add(spec)
+    session.commit()
+    return spec
+
+
+@pytest.fixture
+def make_doctor(session, specialization):
+    def make(name="Dr Test", **fields):
+        user = User(
+            name=name,
+            email=f"{name.lower().replace(' ', '.')}@hospital.test",
+            password="x",
+            role=UserRole.DOCTOR,
+        )
+        session.add(user)
+        session.flush()
+
+        doctor = DoctorProfile(
+            user_id=user.id,
+            full_name=name,
+            specialization_id=specialization.id,
+            is_active=True,
+            is_verified=True,
+            **fields,
+        )
+        session.add(doctor)
+        session.commit()
+        return doctor
+    return make
+
+
+@pytest.fixture
+def make_patient(session):
+    def make(name="Patient"):
+        user = User(
+            name=name,
+            email=f"{name.lower().replace(' ', '.')}@patient.test",
+            password="x",
+            role=UserRole.PATIENT,
+        )
+        session.add(user)
+        session.flush()
+
+        patient = PatientProfile(user_id=user.id, age=30, gender="F", phone="1", address="-")
+        session.add(patient)
+        session.commit()
+        return patient
+    return make
+
+
+@pytest.fixture
+def open_day(session):
+    """Make `doctor` bookable 09:00-13:00 on `day`."""
+    def make(doctor, day, start=time(9), end=time(13)):
+        session.add(DoctorAvailability(
+            doctor_id=doctor.id,
+            date=day,
+            slot_type="morning",
+            is_available=True,
+            start_time=start,
+            end_time=end,
+        ))
+        session.commit()
+    return make
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Bearer headers for a profile row, or for a user (admins have no profile)."""
+    def make(profile=None, user=None):
+        user = user or profile.user
+        with app.app_context():
+            token = create_access_token(
+                identity=str(user.id),
+                additional_claims=profile_claims(user, profile),
+            )
+        return {"Authorization": f"Bearer {token}"}
+    return make
+
+
+@pytest.fixture
+def admin_user(session):
+    user = User(name="Admin", email="admin@hospital.test", password="x", role=UserRole.ADMIN)
+    session.add(user)
+    session.commit()
+    return user
+
+
+@pytest.fixture
+def capture_queries():
+    """
+    Context manager collecting (statement, parameters) for every query run
+    inside its block.
+    """
+    @contextmanager
+    def capture():
+        queries = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            queries.append((statement, parameters))
+
+        event.listen(database.engine, "before_cursor_execute", record)
+        try:
+            yield queries
+        finally:
+            event.remove(database.engine, "before_cursor_execute", record)
+    return capture
@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import api.doctor.availibility as availability_api
+
+
+def slot(day, slot_type="morning", start="08:00", end="10:00"):
+    return {
+        "date": day.isoformat(),
+        "slot_type": slot_type,
+        "is_available": True,
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+def test_bulk_reports_dropped_duplicates(client, make_doctor, auth_headers):
+    headers = auth_headers(make_doctor())
+    day = date.today() + timedelta(days=3)
+
+    resp = client.post("/doctor/availability/bulk", headers=headers, json={"slots": [
+        slot(day, start="08:00"),
+        slot(day, "evening", "14:00", "16:00"),
+        slot(day, start="09:00"),
+    ]})
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["created"] == 2
+    assert body["dropped"] == [
+        {"index": 0, "date": day.isoformat(), "slot_type": "morning"}
+    ]
+
+
+def test_concurrent_bulk_upserts(app, monkeypatch, make_doctor, auth_headers):
+    headers = auth_headers(make_doctor())
+    day = date.today() + timedelta(days=3)
+    payload = {"slots": [slot(day), slot(day + timedelta(days=1))]}
+
+    # Both requests read "no rows yet" before either inserts.
+    barrier = threading.Barrier(2, timeout=10)
+    commit_with_retry = availability_api.commit_with_retry
+
+    def commit_together(session, work, *args, **kwargs):
+        def read_then_wait(session):
+            result = work(session)
+            barrier.wait()
+            return result
+        return commit_with_retry(session, read_then_wait, *args, **kwargs)
+
+    monkeypatch.setattr(availability_api, "commit_with_retry", commit_together)
+
+    def post(_):
+        return app.test_client().post(
+            "/doctor/availability/bulk", headers=headers, json=payload
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        codes = list(pool.map(post, range(2)))
+
+    assert sorted(codes) == [200, 409]
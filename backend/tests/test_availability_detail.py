@@ -0,0 +1,41 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from models import DoctorAvailability
+
+
+@pytest.fixture
+def morning_slot(session, make_doctor, open_day):
+    doctor = make_doctor()
+    open_day(doctor, date.today() + timedelta(days=2), start=time(8), end=time(10))
+    return doctor, session.query(DoctorAvailability).filter_by(doctor_id=doctor.id).one()
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"end_time": "07:30"}, "start_time must be before end_time"),
+    ({"start_time": "08:15"}, "Time must be in 30-minute intervals"),
+    ({"start_time": "14:00", "end_time": "16:00"}, "morning slot must be inside allowed window"),
+    ({"start_time": "8am"}, "Invalid start/end time"),
+])
+def test_put_rejects_invalid_window(client, session, auth_headers, morning_slot, body, message):
+    doctor, slot = morning_slot
+
+    resp = client.put(f"/doctor/availability/{slot.id}", headers=auth_headers(doctor), json=body)
+
+    assert resp.status_code == 400
+    assert resp.get_json()["message"] == message
+    session.refresh(slot)
+    assert (slot.start_time, slot.end_time) == (time(8), time(10))
+
+
+def test_put_validates_against_stored_times(client, session, auth_headers, morning_slot):
+    doctor, slot = morning_slot
+
+    resp = client.put(
+        f"/doctor/availability/{slot.id}", headers=auth_headers(doctor), json={"end_time": "11:30"}
+    )
+
+    assert resp.status_code == 200
+    session.refresh(slot)
+    assert (slot.start_time, slot.end_time) == (time(8), time(11, 30))
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import api.patient.appointment as appointment_api
+
+
+def book(app, headers, doctor_id, day, slot):
+    resp = app.test_client().post("/patient/appointments", headers=headers, json={
+        "doctor_id": doctor_id,
+        "date": day.isoformat(),
+        "time": slot,
+    })
+    return resp.status_code
+
+
+def test_two_bookings_for_one_slot(
+    app, monkeypatch, make_doctor, make_patient, open_day, auth_headers
+):
+    doctor = make_doctor()
+    day = date.today() + timedelta(days=1)
+    open_day(doctor, day)
+    headers = [auth_headers(make_patient(f"Patient {i}")) for i in range(2)]
+
+    # Hold both requests after their conflict check, so both reach the
+    # insert and only the unique index can tell them apart.
+    barrier = threading.Barrier(2, timeout=10)
+    commit_with_retry = appointment_api.commit_with_retry
+
+    def commit_together(session, work, *args, **kwargs):
+        barrier.wait()
+        return commit_with_retry(session, work, *args, **kwargs)
+
+    monkeypatch.setattr(appointment_api, "commit_with_retry", commit_together)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        codes = list(pool.map(
+            lambda h: book(app, h, doctor.id, day, "10:00"), headers
+        ))
+
+    assert sorted(codes) == [201, 409]
+
+
+def test_concurrent_bookings_stress(
+    app, make_doctor, make_patient, open_day, auth_headers
+):
+    doctor = make_doctor()
+    day = date.today() + timedelta(days=1)
+    open_day(doctor, day)
+
+    slots = ["09:00", "09:30", "10:00", "10:30", "11:00", "11:30", "12:00", "12:30"]
+    patients = [auth_headers(make_patient(f"Patient {i}")) for i in range(25)]
+    attempts = [(h, slot) for h in patients for slot in slots]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(
+            lambda a: (a[1], book(app, a[0], doctor.id, day, a[1])), attempts
+        ))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{len(attempts)} concurrent bookings in {elapsed:.2f}s "
+          f"({len(attempts) / elapsed:.0f} req/s)")
+
+    assert {code for _, code in results} <= {201, 409}
+    booked = Counter(slot for slot, code in results if code == 201)
+    assert booked == {slot: 1 for slot in slots}
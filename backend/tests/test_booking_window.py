@@ -0,0 +1,61 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from models import Appointment, DoctorWeeklySchedule
+
+
+@pytest.fixture
+def every_day(session):
+    """Give `doctor` a weekly template open all day, every day."""
+    def make(doctor):
+        for weekday in range(7):
+            session.add(DoctorWeeklySchedule(
+                doctor_id=doctor.id,
+                weekday=weekday,
+                slot_type="morning",
+                is_available=True,
+                start_time=time(0),
+                end_time=time(23, 30),
+            ))
+        session.commit()
+    return make
+
+
+def book(client, headers, doctor, day, slot):
+    return client.post("/patient/appointments", headers=headers, json={
+        "doctor_id": doctor.id,
+        "date": day.isoformat(),
+        "time": slot,
+    })
+
+
+@pytest.fixture
+def booking(client, make_doctor, make_patient, every_day, auth_headers, session):
+    doctor = make_doctor()
+    every_day(doctor)
+    headers = auth_headers(make_patient())
+
+    def attempt(day, slot):
+        resp = book(client, headers, doctor, day, slot)
+        return resp.status_code, session.query(Appointment).count()
+    return attempt
+
+
+def test_rejects_past_dates(booking):
+    assert booking(date.today() - timedelta(days=1), "10:00") == (400, 0)
+
+
+def test_rejects_past_times_today(booking):
+    assert booking(date.today(), "00:00") == (400, 0)
+
+
+def test_rejects_dates_past_the_horizon(booking):
+    today = date.today()
+    assert booking(today + timedelta(days=8), "10:00") == (400, 0)
+    assert booking(today + timedelta(days=365), "10:00") == (400, 0)
+
+
+def test_accepts_the_last_day_of_the_horizon(booking):
+    day = date.today() + timedelta(days=7)
+    assert booking(day, "10:00") == (201, 1)
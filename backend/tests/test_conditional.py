@@ -0,0 +1,43 @@
+def test_dashboard_revalidates_by_etag_only(client, admin_user, make_patient, auth_headers):
+    headers = auth_headers(user=admin_user)
+
+    first = client.get("/admin/dashboard", headers=headers)
+    assert first.status_code == 200
+    assert "Last-Modified" not in first.headers
+
+    etag = first.headers["ETag"]
+    assert client.get(
+        "/admin/dashboard", headers={**headers, "If-None-Match": etag}
+    ).status_code == 304
+
+    # A new patient changes the counts without touching any appointment.
+    client.post("/auth/register", json={
+        "name": "New", "email": "new@patient.test", "password": "pw",
+        "age": 30, "gender": "F", "phone": "1", "address": "-",
+    })
+    resp = client.get("/admin/dashboard", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.get_json()["stats"]["patients"] == 1
+
+    # If-Modified-Since alone never yields a 304 here.
+    assert client.get("/admin/dashboard", headers={
+        **headers, "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT",
+    }).status_code == 200
+
+
+def test_doctor_list_etag_ignores_param_order_and_unknown_params(
+    client, make_doctor, make_patient, auth_headers
+):
+    make_doctor()
+    headers = auth_headers(make_patient())
+
+    def etag(query):
+        resp = client.get(f"/patient/doctors?{query}", headers=headers)
+        assert resp.status_code == 200
+        return resp.headers["ETag"]
+
+    base = etag("search=Dr&sort=fees_low")
+    assert etag("sort=fees_low&search=Dr") == base
+    assert etag("search=%20dr%20&sort=fees_low&_=123") == base
+    assert etag("search=Dr&sort=bogus") == etag("search=Dr")
+    assert etag("search=Dr&sort=fees_high") != base
@@ -0,0 +1,113 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from models import Appointment, AppointmentStatus, MedicalRecord
+
+
+@pytest.fixture
+def visits(session, make_doctor):
+    """Give `patient` `count` visits spread over several doctors, each with a record."""
+    def make(patient, count, doctors=3):
+        doctor_ids = [make_doctor(f"Dr {patient.id} {i}").id for i in range(doctors)]
+        today = date.today()
+
+        for i in range(count):
+            appt = Appointment(
+                patient_id=patient.id,
+                doctor_id=doctor_ids[i % doctors],
+                date=today - timedelta(days=i),
+                time=time(9),
+                status=AppointmentStatus.COMPLETED,
+            )
+            session.add(appt)
+            session.flush()
+            session.add(MedicalRecord(appointment_id=appt.id, diagnosis="ok"))
+
+        # One still to come, for the upcoming appointment card.
+        session.add(Appointment(
+            patient_id=patient.id,
+            doctor_id=doctor_ids[0],
+            date=today + timedelta(days=1),
+            time=time(10),
+            status=AppointmentStatus.CONFIRMED,
+        ))
+        session.commit()
+    return make
+
+
+def dashboard_queries(client, capture_queries, url, headers):
+    with capture_queries() as queries:
+        resp = client.get(url, headers=headers)
+    assert resp.status_code == 200
+    return len(queries)
+
+
+def test_patient_dashboard_query_count(
+    client, make_patient, visits, auth_headers, capture_queries
+):
+    few, many = make_patient("Few Visits"), make_patient("Many Visits")
+    visits(few, 1, doctors=1)
+    visits(many, 8, doctors=4)
+
+    counts = [
+        dashboard_queries(client, capture_queries, "/patient/dashboard", auth_headers(p))
+        for p in (few, many)
+    ]
+
+    # Validator aggregate, stats, upcoming, recent appointments, recent
+    # records: no query per row, however many visits and doctors.
+    assert counts[0] == counts[1]
+    assert counts[1] <= 5
+
+
+def test_admin_dashboard_query_count(
+    client, admin_user, make_patient, visits, auth_headers, capture_queries
+):
+    headers = auth_headers(user=admin_user)
+
+    visits(make_patient("First"), 2, doctors=1)
+    before = dashboard_queries(client, capture_queries, "/admin/dashboard", headers)
+
+    visits(make_patient("Second"), 9, doctors=5)
+    after = dashboard_queries(client, capture_queries, "/admin/dashboard", headers)
+
+    # Validator aggregate, stats, recent appointments.
+    assert before == after
+    assert after <= 3
+
+
+def test_doctor_dashboard_query_count(
+    client, session, make_doctor, make_patient, open_day, auth_headers, capture_queries
+):
+    doctor = make_doctor()
+    open_day(doctor, date.today())
+    headers = auth_headers(doctor)
+
+    def upcoming(count, first_hour):
+        for i in range(count):
+            session.add(Appointment(
+                patient_id=make_patient(f"Upcoming {count} {i}").id,
+                doctor_id=doctor.id,
+                date=date.today() + timedelta(days=1),
+                time=time(first_hour + i),
+                status=AppointmentStatus.CONFIRMED,
+            ))
+        session.commit()
+
+    upcoming(1, 8)
+    with capture_queries() as few:
+        assert client.get("/doctor/dashboard", headers=headers).status_code == 200
+
+    upcoming(4, 10)
+    with capture_queries() as many:
+        assert client.get("/doctor/dashboard", headers=headers).status_code == 200
+
+    # No query per upcoming appointment, and today's windows are resolved
+    # once for both the validator and the body.
+    assert len(few) == len(many)
+    availability_reads = [
+        statement for statement, _ in many
+        if "FROM doctor_daily_availability" in statement
+    ]
+    assert len(availability_reads) == 1
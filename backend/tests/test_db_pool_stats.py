@@ -0,0 +1,10 @@
+def test_pool_stats_report_connection_acquisition(client, admin_user, auth_headers):
+    headers = auth_headers(user=admin_user)
+    client.get("/admin/dashboard", headers=headers)
+
+    resp = client.get("/admin/db/pool", headers=headers)
+    assert resp.status_code == 200
+
+    acquire = resp.get_json()["connection_acquire"]
+    assert acquire["count"] > 0
+    assert acquire["max_ms"] >= acquire["avg_ms"] >= 0
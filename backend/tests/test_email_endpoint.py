@@ -0,0 +1,13 @@
+from models import EmailOutbox
+
+
+def test_test_email_needs_an_admin_post(client, session, admin_user, make_patient, auth_headers):
+    assert client.get("/test-email").status_code == 405
+    assert client.post("/test-email").status_code == 401
+    assert client.post("/test-email", headers=auth_headers(make_patient())).status_code == 403
+    assert session.query(EmailOutbox).count() == 0
+
+    resp = client.post("/test-email", headers=auth_headers(user=admin_user))
+    assert resp.status_code == 202
+    row = session.query(EmailOutbox).one()
+    assert admin_user.email in row.recipients
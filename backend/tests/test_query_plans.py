@@ -0,0 +1,75 @@
+import re
+from datetime import date, time, timedelta
+
+import database
+
+HOT_TABLES = ("appointments", "doctor_daily_availability")
+FULL_SCAN = re.compile(r"^SCAN (%s)\b" % "|".join(HOT_TABLES))
+
+
+def full_scans(queries):
+    """EXPLAIN QUERY PLAN every captured query on a hot table; return full scans."""
+    scans = []
+    with database.engine.connect() as conn:
+        for statement, parameters in queries:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            if not any(table in statement for table in HOT_TABLES):
+                continue
+
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, tuple(parameters)
+            ).all()
+            scans += [
+                (row[-1], statement) for row in plan if FULL_SCAN.match(row[-1])
+            ]
+    return scans
+
+
+def test_booking_queries_use_indexes(
+    client, make_doctor, make_patient, open_day, auth_headers, capture_queries
+):
+    doctor = make_doctor()
+    patient = make_patient()
+    day = date.today() + timedelta(days=1)
+    open_day(doctor, day)
+    headers = auth_headers(patient)
+
+    with capture_queries() as queries:
+        resp = client.post("/patient/appointments", headers=headers, json={
+            "doctor_id": doctor.id,
+            "date": day.isoformat(),
+            "time": "09:30",
+        })
+
+    assert resp.status_code == 201
+    assert full_scans(queries) == []
+
+
+def test_patient_availability_queries_use_indexes(
+    client, make_doctor, make_patient, open_day, auth_headers, capture_queries
+):
+    doctor = make_doctor()
+    patient = make_patient()
+    open_day(doctor, date.today() + timedelta(days=2))
+    headers = auth_headers(patient)
+
+    with capture_queries() as queries:
+        resp = client.get(f"/patient/doctors/{doctor.id}/availability", headers=headers)
+
+    assert resp.status_code == 200
+    assert full_scans(queries) == []
+
+
+def test_doctor_availability_queries_use_indexes(
+    client, make_doctor, open_day, auth_headers, capture_queries
+):
+    doctor = make_doctor()
+    open_day(doctor, date.today(), start=time(14), end=time(16))
+    headers = auth_headers(doctor)
+
+    with capture_queries() as queries:
+        resp = client.get("/doctor/availability", headers=headers)
+
+    assert resp.status_code == 200
+    assert full_scans(queries) == []
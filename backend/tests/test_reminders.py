@@ -0,0 +1,98 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+import tasks.scheduled_jobs as jobs
+from cache.redis_client import redis_client
+
+DAY = "2026-01-05"
+
+
+class FakeConnection:
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.attempts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send(self, message):
+        self.attempts += 1
+        if self.attempts - 1 in self.fail_on:
+            raise OSError("rejected")
+
+
+class RefusedConnection:
+    def __enter__(self):
+        raise ConnectionRefusedError("smtp down")
+
+    def __exit__(self, *exc):
+        return False
+
+
+def reminders(count):
+    return [
+        {
+            "appointment_id": i,
+            "patient_name": "Patient",
+            "email": f"p{i}@patient.test",
+            "doctor_name": "Dr Test",
+            "date": DAY,
+            "time": "10:00",
+        }
+        for i in range(count)
+    ]
+
+
+def run_chunk(monkeypatch, connection, chunk, task_id="chunk-1"):
+    monkeypatch.setattr(jobs, "email_connection", lambda: connection)
+    return jobs.send_reminder_chunk.apply(args=[chunk], task_id=task_id).get()
+
+
+def marked():
+    return {int(i) for i in redis_client.smembers(jobs.reminder_marker_key(DAY))}
+
+
+def test_marks_only_sent_reminders(app, monkeypatch):
+    counts = run_chunk(monkeypatch, FakeConnection(fail_on={1}), reminders(3))
+
+    assert counts == {"sent": 2, "failed": 1, "skipped": 0}
+    assert marked() == {0, 2}
+
+
+def test_connection_failure_fails_the_chunk_without_raising(app, monkeypatch):
+    counts = run_chunk(monkeypatch, RefusedConnection(), reminders(4))
+
+    assert counts == {"sent": 0, "failed": 4, "skipped": 0}
+    assert marked() == set()
+
+
+def test_rerun_skips_sent_reminders(app, monkeypatch):
+    run_chunk(monkeypatch, FakeConnection(), reminders(2))
+    counts = run_chunk(monkeypatch, FakeConnection(), reminders(3), task_id="rerun")
+
+    assert counts == {"sent": 1, "failed": 0, "skipped": 2}
+
+
+def test_redelivered_chunk_takes_back_its_own_claim(app, monkeypatch):
+    # The worker died after claiming reminder 0 but before sending it.
+    redis_client.set(jobs.reminder_claim_key(DAY, 0), "chunk-1")
+    # Another chunk is sending reminder 1 right now.
+    redis_client.set(jobs.reminder_claim_key(DAY, 1), "other")
+
+    counts = run_chunk(monkeypatch, FakeConnection(), reminders(2))
+
+    assert counts == {"sent": 1, "failed": 0, "skipped": 1}
+    assert marked() == {0}
+
+
+def test_redis_errors_are_not_reported_as_smtp_failures(app, monkeypatch):
+    def down(*args, **kwargs):
+        raise RedisConnectionError("redis down")
+
+    monkeypatch.setattr(redis_client, "sismember", down)
+
+    with pytest.raises(RedisConnectionError):
+        run_chunk(monkeypatch, FakeConnection(), reminders(1))
@@ -0,0 +1,40 @@
+from tasks import task_logger
+
+
+def add_log(task_id, started, name="tasks.send_reminder_chunk", expired=False):
+    for index in (task_logger.TASK_INDEX, task_logger.task_index_key(name)):
+        task_logger.redis_client.zadd(index, {task_id: started})
+    if not expired:
+        task_logger.save_log(task_id, "SUCCESS", {"task": name})
+
+
+def pages(client, headers, limit):
+    seen, cursor = [], None
+    while True:
+        query = f"/admin/tasks?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(query, headers=headers)
+        assert resp.status_code == 200
+        body = resp.get_json()
+        seen += [item["task_id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return seen
+
+
+def test_paging_keeps_tasks_started_together(client, admin_user, auth_headers):
+    # A chord's chunks are dispatched in the same instant.
+    add_log("solo-late", 1002.0)
+    for i in range(7):
+        add_log(f"chunk-{i}", 1001.5, expired=(i == 3))
+    add_log("solo-early", 1000.0)
+
+    expected = ["solo-late"] + [f"chunk-{i}" for i in (6, 5, 4, 2, 1, 0)] + ["solo-early"]
+    headers = auth_headers(user=admin_user)
+
+    for limit in (1, 2, 3, 5, 50):
+        assert pages(client, headers, limit) == expected
+
+
+def test_rejects_a_malformed_cursor(client, admin_user, auth_headers):
+    resp = client.get("/admin/tasks?cursor=yesterday", headers=auth_headers(user=admin_user))
+    assert resp.status_code == 400
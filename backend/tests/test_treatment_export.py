@@ -0,0 +1,64 @@
+import csv
+import gzip
+import json
+import os
+from datetime import date, time, timedelta
+
+import tasks.email_jobs as email_jobs
+from models import Appointment, AppointmentStatus, EmailOutbox, EmailStatus, MedicalRecord
+from tasks.background_jobs import export_patient_treatments_csv
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def test_export_attaches_the_file_by_path(app, session, monkeypatch, make_doctor, make_patient):
+    doctor, patient = make_doctor(), make_patient()
+    for i in range(3):
+        appt = Appointment(
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            date=date.today() - timedelta(days=i),
+            time=time(9),
+            status=AppointmentStatus.COMPLETED,
+        )
+        session.add(appt)
+        session.flush()
+        session.add(MedicalRecord(appointment_id=appt.id, diagnosis=f"visit {i}"))
+    session.commit()
+
+    export_patient_treatments_csv.apply(args=[patient.user_id]).get()
+
+    row = session.query(EmailOutbox).one()
+    (attachment,) = json.loads(row.attachments)
+    assert "data" not in attachment
+    path = attachment["path"]
+
+    with gzip.open(path, "rt", newline="") as f:
+        lines = list(csv.reader(f))
+    assert [line[lines[0].index("diagnosis")] for line in lines[1:]] == [
+        "visit 2", "visit 1", "visit 0"
+    ]
+
+    conn = FakeConnection()
+    monkeypatch.setattr(email_jobs, "email_connection", lambda: conn)
+    assert email_jobs.deliver_email_outbox.apply().get()["sent"] == 1
+
+    (message,) = conn.sent
+    (attached,) = message.attachments
+    assert gzip.decompress(attached.data).startswith(b"patient_user_id,")
+
+    session.refresh(row)
+    assert row.status == EmailStatus.SENT
+    assert not os.path.exists(path)
@@ -1,8 +1,13 @@
-from flask_jwt_extended import verify_jwt_in_request, get_jwt, jwt_required
-from flask import jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity, jwt_required
+from flask import g, jsonify
 from functools import wraps
 
-def role_required(*allowed_roles):
+from cache.revocation import is_token_revoked
+from database import get_db_session
+from models import DoctorProfile, PatientProfile
+
+
+def role_required(*allowed_roles, message="Forbidden"):
     def wrapper(fn):
         @wraps(fn)
         @jwt_required()
@@ -13,9 +18,83 @@ def role_required(*allowed_roles):
             allowed = [r.lower() for r in allowed_roles]
 
             if role not in allowed:
-                return {"message": "Forbidden"}, 403
+                return {"message": message}, 403
+
+            # Served from a per-process snapshot of the Redis revocation
+            # list, so no query on the common path.
+            if is_token_revoked(claims):
+                return {"message": "Your account is not active!"}, 401
 
             return fn(*args, **kwargs)
         return decorator
     return wrapper
 
+
+def admin_required(fn):
+    return role_required("admin", message="Admin only")(fn)
+
+
+def profile_claims(user, profile):
+    """Claims embedded in access tokens by Login and Register."""
+    return {
+        "role": user.role.value,
+        "profile_id": profile.id if profile else None,
+    }
+
+
+def _claimed_profile_id(role):
+    claims = get_jwt()
+    if claims.get("role", "").lower() != role:
+        return None
+    return claims.get("profile_id")
+
+
+def _current_profile(model, role):
+    """
+    The caller's profile row, loaded at most once per request and cached on
+    `flask.g`. Tokens issued before profile_id was added fall back to a
+    lookup by user id.
+    """
+    cache_key = f"current_{role}"
+
+    if cache_key not in g:
+        session = get_db_session()
+        user_id = int(get_jwt_identity())
+        profile_id = _claimed_profile_id(role)
+
+        if profile_id is not None:
+            profile = session.get(model, profile_id)
+            if profile and profile.user_id != user_id:
+                profile = None
+        else:
+            profile = session.query(model).filter_by(user_id=user_id).first()
+
+        setattr(g, cache_key, profile)
+
+    return getattr(g, cache_key)
+
+
+def _current_profile_id(model, role):
+    """Profile id straight from the token claims, without a query."""
+    profile_id = _claimed_profile_id(role)
+    if profile_id is not None:
+        return profile_id
+
+    profile = _current_profile(model, role)
+    return profile.id if profile else None
+
+
+def current_doctor():
+    return _current_profile(DoctorProfile, "doctor")
+
+
+def current_doctor_id():
+    return _current_profile_id(DoctorProfile, "doctor")
+
+
+def current_patient():
+    return _current_profile(PatientProfile, "patient")
+
+
+def current_patient_id():
+    return _current_profile_id(PatientProfile, "patient")
@@ -0,0 +1,125 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+
+from cache.cache_utils import DOCTOR_DIRECTORY, cache_generation
+from database import get_db_session
+from models import Appointment, MedicalRecord
+
+
+def make_etag(version):
+    """
+    Weak ETag for `version` (anything with a stable repr). The caller's
+    identity is mixed in, since the same validator can describe different
+    bodies for different users sharing a browser cache.
+    """
+    raw = repr((get_jwt_identity(), version)).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def http_last_modified(last_modified):
+    """
+    `last_modified` truncated to whole seconds as HTTP dates are, or None
+    while it is still within the current second: another change in that
+    second would carry the same date, so it can't be validated by date yet.
+    """
+    if last_modified is None:
+        return None
+    if datetime.utcnow() - last_modified < timedelta(seconds=1):
+        return None
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def is_not_modified(etag, last_modified=None):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if last_modified is not None and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+
+    return False
+
+
+def conditional(validator):
+    """
+    Conditional GET for a Resource method.
+
+    `validator(*args, **kwargs)` gets the view arguments (without self) and
+    returns (version, last_modified): `version` is any cheap value that
+    changes whenever the body would. `last_modified` is a naive UTC
+    datetime, and only for resources where it alone moves with every
+    change; if `version` also relies on counts (deletes leave no stamp)
+    or cache generations, return None and the resource is validated by
+    ETag only. When the request's If-None-Match / If-Modified-Since match,
+    a 304 is returned without calling the handler; otherwise the handler's
+    200 response gets ETag/Last-Modified headers.
+
+    Put it below the auth decorator so validators only run for callers
+    allowed to see the resource.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(self, *args, **kwargs):
+            version, last_modified = validator(*args, **kwargs)
+            etag = make_etag(version)
+            last_modified = http_last_modified(last_modified)
+
+            headers = {
+                "ETag": f'W/"{etag}"',
+                # Let the browser keep the body but revalidate every time.
+                "Cache-Control": "private, no-cache",
+            }
+            if last_modified is not None:
+                headers["Last-Modified"] = last_modified.strftime(
+                    "%a, %d %b %Y %H:%M:%S GMT"
+                )
+
+            if is_not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+
+            rv = fn(self, *args, **kwargs)
+            if not isinstance(rv, tuple):
+                rv = (rv, 200)
+
+            body, code = rv[0], rv[1]
+            if code != 200:
+                return rv
+
+            extra = rv[2] if len(rv) > 2 else {}
+            return body, code, {**headers, **extra}
+        return decorator
+    return wrapper
+
+
+def row_version(query, *models):
+    """
+    (count, newest updated_at) over the rows `query` selects, in a single
+    aggregate. With several models the newest stamp across all of them is
+    used, so an edit to any joined row moves the version.
+    """
+    count, *stamps = query.with_entities(
+        func.count(), *(func.max(model.updated_at) for model in models)
+    ).one()
+    return count, max(filter(None, stamps), default=None)
+
+
+def history_version(patient_id, doctor_id=None):
+    """
+    Validator for a patient's treatment history (only `doctor_id`'s visits
+    if given): the history rows plus the doctor directory generation, since
+    doctor names are rendered too. ETag only, as the generation has no date.
+    """
+    query = (
+        get_db_session().query(Appointment)
+        .join(MedicalRecord, MedicalRecord.appointment_id == Appointment.id)
+        .filter(Appointment.patient_id == patient_id)
+    )
+    if doctor_id is not None:
+        query = query.filter(Appointment.doctor_id == doctor_id)
+
+    count, newest = row_version(query, Appointment, MedicalRecord)
+    return (count, newest, cache_generation(DOCTOR_DIRECTORY)), None
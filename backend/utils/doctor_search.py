@@ -0,0 +1,103 @@
+import re
+
+from sqlalchemy import Float, Integer, text
+
+# Full-text index over the doctor directory. rowid is the doctor_profiles id;
+# triggers keep it in sync with doctor, user and specialization writes.
+DOCTOR_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS doctor_search USING fts5(
+        full_name, user_name, specialization,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS doctor_search_ai AFTER INSERT ON doctor_profiles BEGIN
+        INSERT INTO doctor_search (rowid, full_name, user_name, specialization)
+        SELECT NEW.id, NEW.full_name,
+               (SELECT name FROM users WHERE id = NEW.user_id),
+               (SELECT name FROM specializations WHERE id = NEW.specialization_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS doctor_search_au AFTER UPDATE ON doctor_profiles BEGIN
+        DELETE FROM doctor_search WHERE rowid = OLD.id;
+        INSERT INTO doctor_search (rowid, full_name, user_name, specialization)
+        SELECT NEW.id, NEW.full_name,
+               (SELECT name FROM users WHERE id = NEW.user_id),
+               (SELECT name FROM specializations WHERE id = NEW.specialization_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS doctor_search_ad AFTER DELETE ON doctor_profiles BEGIN
+        DELETE FROM doctor_search WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS doctor_search_user_au AFTER UPDATE OF name ON users BEGIN
+        UPDATE doctor_search SET user_name = NEW.name
+        WHERE rowid IN (SELECT id FROM doctor_profiles WHERE user_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS doctor_search_spec_au AFTER UPDATE OF name ON specializations BEGIN
+        UPDATE doctor_search SET specialization = NEW.name
+        WHERE rowid IN (SELECT id FROM doctor_profiles WHERE specialization_id = NEW.id);
+    END
+    """,
+]
+
+DOCTOR_SEARCH_REBUILD = [
+    "DELETE FROM doctor_search",
+    """
+    INSERT INTO doctor_search (rowid, full_name, user_name, specialization)
+    SELECT d.id, d.full_name, u.name, s.name
+    FROM doctor_profiles d
+    LEFT JOIN users u ON u.id = d.user_id
+    LEFT JOIN specializations s ON s.id = d.specialization_id
+    """,
+]
+
+# Column weights for bm25(): doctor name first, account name, then specialty.
+_RANKED = text(
+    """
+    SELECT rowid AS doctor_id, bm25(doctor_search, 10.0, 5.0, 2.0) AS rank
+    FROM doctor_search
+    WHERE doctor_search MATCH :match
+    """
+).columns(doctor_id=Integer, rank=Float)
+
+
+def ensure_doctor_search_index(engine):
+    """Create the index and triggers on SQLite, backfilling a new index."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'doctor_search'")
+        ).first()
+
+        for ddl in DOCTOR_SEARCH_DDL:
+            conn.exec_driver_sql(ddl)
+
+        if not exists:
+            for stmt in DOCTOR_SEARCH_REBUILD:
+                conn.exec_driver_sql(stmt)
+
+
+def build_match_query(term):
+    """
+    Turn user input into an FTS5 query: every word must match as a prefix.
+    Returns None when nothing searchable is left.
+    """
+    tokens = re.findall(r"\w+", term.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def ranked_matches(match):
+    """Subquery of (doctor_id, rank) for an FTS5 match; lower rank is better."""
+    return _RANKED.bindparams(match=match).subquery("doctor_search_hits")
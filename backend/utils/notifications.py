@@ -1,10 +1,17 @@
+import base64
+import json
+import os
+
 from ext import mail
 from flask_mail import Message
 
+from database import get_db_session
+from models import EmailOutbox
+
 
-def send_email(to, subject, body, attachments=None, cc=None, bcc=None):
+def build_message(to, subject, body, attachments=None, cc=None, bcc=None):
     """
-    Send an email with optional attachments.
+    Build an HTML email with optional attachments.
 
     attachments format:
         [
@@ -29,4 +36,87 @@ def send_email(to, subject, body, attachments=None, cc=None, bcc=None):
                 data=file_bytes
             )
 
-    mail.send(msg)
+    return msg
+
+
+def email_connection():
+    """
+    One SMTP connection for sending many messages:
+
+        with email_connection() as conn:
+            conn.send(build_message(...))
+    """
+    return mail.connect()
+
+
+def queue_email(to, subject, body, attachments=None, cc=None, bcc=None,
+                file_attachments=None, session=None):
+    """
+    Add an email to the outbox and return the row; delivery happens in
+    the `tasks.deliver_email_outbox` worker, never on the caller's thread.
+    Takes the same arguments as build_message. The row is only added to
+    the session: the caller commits, so the email goes out if and only if
+    the caller's transaction does.
+
+    `file_attachments` are (filename, path, mime) for files too large to
+    keep in the row: only the path is stored, the file is read when the
+    email is sent and removed once it is sent or dead.
+    """
+    session = session or get_db_session()
+
+    stored = [
+        {
+            "filename": filename,
+            "mime": mime,
+            "data": base64.b64encode(file_bytes).decode("ascii"),
+        }
+        for filename, file_bytes, mime in attachments or ()
+    ] + [
+        {"filename": filename, "mime": mime, "path": path}
+        for filename, path, mime in file_attachments or ()
+    ]
+
+    row = EmailOutbox(
+        recipients=json.dumps([to] if isinstance(to, str) else list(to)),
+        cc=json.dumps(cc) if cc else None,
+        bcc=json.dumps(bcc) if bcc else None,
+        subject=subject,
+        body=body,
+        attachments=json.dumps(stored) if stored else None,
+    )
+    session.add(row)
+    return row
+
+
+def _attachment_bytes(attachment):
+    if "path" in attachment:
+        with open(attachment["path"], "rb") as f:
+            return f.read()
+    return base64.b64decode(attachment["data"])
+
+
+def outbox_message(row):
+    """Rebuild the Message for an EmailOutbox row."""
+    attachments = [
+        (a["filename"], _attachment_bytes(a), a["mime"])
+        for a in json.loads(row.attachments)
+    ] if row.attachments else None
+
+    return build_message(
+        json.loads(row.recipients),
+        row.subject,
+        row.body,
+        attachments,
+        json.loads(row.cc) if row.cc else None,
+        json.loads(row.bcc) if row.bcc else None,
+    )
+
+
+def remove_outbox_files(row):
+    """Delete the files an EmailOutbox row's attachments point at."""
+    for a in json.loads(row.attachments) if row.attachments else ():
+        if "path" in a:
+            try:
+                os.remove(a["path"])
+            except FileNotFoundError:
+                pass
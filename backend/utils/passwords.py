@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+def hash_password(password):
+    """Hash with the configured PASSWORD_HASH_METHOD."""
+    return generate_password_hash(
+        password, method=current_app.config["PASSWORD_HASH_METHOD"]
+    )
+
+
+@lru_cache(maxsize=8)
+def method_prefix(method):
+    """
+    Full parameter string werkzeug writes for `method`, so "scrypt" and
+    "scrypt:32768:8:1" compare equal. Costs one hash per method per process.
+    """
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def needs_rehash(stored_hash):
+    method = current_app.config["PASSWORD_HASH_METHOD"]
+    return stored_hash.split("$", 1)[0] != method_prefix(method)
+
+
+def verify_password(user, password):
+    """
+    Check `password` against the user's stored hash. On success a hash made
+    with older parameters is replaced in place; the caller commits.
+    """
+    if not check_password_hash(user.password, password):
+        return False
+
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+
+    return True
@@ -0,0 +1,75 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from models import DoctorAvailability, DoctorWeeklySchedule
+
+SLOT_TYPES = ("morning", "evening")
+
+# A doctor's effective window for one date and slot_type. `id` is the
+# DoctorAvailability row when the day is overridden, None when it comes
+# from the weekly template.
+Window = namedtuple(
+    "Window",
+    "id doctor_id date slot_type is_available start_time end_time source",
+)
+
+
+def resolve_windows(session, doctor_ids, start_date, end_date):
+    """
+    Effective availability for the doctors between start_date and end_date
+    (inclusive): per-date rows win, weekly templates fill in the rest.
+    Costs two queries regardless of the range length.
+    """
+    if not doctor_ids:
+        return []
+
+    overrides = {
+        (o.doctor_id, o.date, o.slot_type): o
+        for o in session.query(DoctorAvailability)
+        .filter(DoctorAvailability.doctor_id.in_(doctor_ids))
+        .filter(DoctorAvailability.date >= start_date)
+        .filter(DoctorAvailability.date <= end_date)
+        .all()
+    }
+
+    templates = {
+        (t.doctor_id, t.weekday, t.slot_type): t
+        for t in session.query(DoctorWeeklySchedule)
+        .filter(DoctorWeeklySchedule.doctor_id.in_(doctor_ids))
+        .all()
+    }
+
+    windows = []
+    d = start_date
+    while d <= end_date:
+        for doctor_id in doctor_ids:
+            for slot_type in SLOT_TYPES:
+                o = overrides.get((doctor_id, d, slot_type))
+                if o:
+                    windows.append(Window(
+                        o.id, doctor_id, d, slot_type,
+                        bool(o.is_available), o.start_time, o.end_time,
+                        "override",
+                    ))
+                    continue
+
+                t = templates.get((doctor_id, d.weekday(), slot_type))
+                if t:
+                    windows.append(Window(
+                        None, doctor_id, d, slot_type,
+                        bool(t.is_available), t.start_time, t.end_time,
+                        "weekly",
+                    ))
+        d += timedelta(days=1)
+
+    return windows
+
+
+def open_windows(session, doctor_ids, start_date, end_date):
+    """Only the bookable windows, ordered by date and start time."""
+    windows = [
+        w for w in resolve_windows(session, doctor_ids, start_date, end_date)
+        if w.is_available and w.start_time and w.end_time
+    ]
+    windows.sort(key=lambda w: (w.date, w.start_time, w.doctor_id))
+    return windows
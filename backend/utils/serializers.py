@@ -0,0 +1,205 @@
+"""
+Response shapes, declared once and compiled into plain functions.
+
+A shape maps output keys to:
+    "attr.path"              dotted attribute path; None if any step is None
+    (path, formatter)        formatter(value), skipped when value is None
+    Nested(path, fields)     nested shape over obj.<path>, None when missing
+
+compile_shape() turns a shape into generated Python source, so serializing
+a row is one function call with straight-line attribute access and no
+per-field dispatch. The result works on ORM objects and on SQLAlchemy Row
+tuples alike, since both expose attributes by name.
+"""
+from operator import attrgetter
+
+from flask import make_response
+import orjson
+
+
+class Nested:
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = fields
+
+
+def iso(value):
+    return value.isoformat()
+
+
+def hhmm(value):
+    return f"{value.hour:02d}:{value.minute:02d}"
+
+
+enum_value = attrgetter("value")
+
+
+def compile_shape(fields, name="serialize"):
+    env = {}
+    lines = [f"def {name}(obj):"]
+    counter = [0]
+
+    def temp():
+        counter[0] += 1
+        return f"v{counter[0]}"
+
+    def access(base, path):
+        """Emit None-safe lines walking `path` from `base`; return the var."""
+        var = base
+        for attr in path.split("."):
+            nxt = temp()
+            if var == base == "obj":
+                lines.append(f"    {nxt} = obj.{attr}")
+            else:
+                lines.append(f"    {nxt} = None if {var} is None else {var}.{attr}")
+            var = nxt
+        return var
+
+    def build(base, spec):
+        parts = []
+        for key, value in spec.items():
+            if isinstance(value, Nested):
+                src = access(base, value.path)
+                inner = build(src, value.fields)
+                parts.append(f"{key!r}: (None if {src} is None else {inner})")
+            elif isinstance(value, tuple):
+                path, formatter = value
+                fmt = f"f{len(env)}"
+                env[fmt] = formatter
+                var = access(base, path)
+                parts.append(f"{key!r}: (None if {var} is None else {fmt}({var}))")
+            else:
+                parts.append(f"{key!r}: {access(base, value)}")
+        return "{" + ", ".join(parts) + "}"
+
+    body = build("obj", fields)
+    lines.append(f"    return {body}")
+
+    exec(compile("\n".join(lines), f"<shape {name}>", "exec"), env)
+    return env[name]
+
+
+def dump_many(serialize, rows):
+    return [serialize(row) for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Shared shapes
+# ---------------------------------------------------------------------------
+
+DOCTOR_BRIEF = {
+    "id": "id",
+    "name": "full_name",
+    "specialization": "specialization.name",
+}
+
+RECORD_FIELDS = {
+    "id": "id",
+    "visit_type": "visit_type",
+    "tests": "tests_done",
+    "diagnosis": "diagnosis",
+    "medicines": "medicines",
+    "prescription": "prescription",
+    "notes": "notes",
+}
+
+# Admin appointment listing
+admin_appointment = compile_shape({
+    "id": "id",
+    "date": ("date", iso),
+    "time": ("time", hhmm),
+    "status": ("status", enum_value),
+    "notes": "notes",
+    "doctor": Nested("doctor", {**DOCTOR_BRIEF, "email": "user.email"}),
+    "patient": Nested("patient", {
+        "id": "id",
+        "name": "user.name",
+        "email": "user.email",
+        "age": "age",
+        "gender": "gender",
+        "phone": "phone",
+    }),
+    "record": Nested("medical_record", RECORD_FIELDS),
+}, "admin_appointment")
+
+# Doctor's view of an appointment
+doctor_appointment = compile_shape({
+    "id": "id",
+    "date": ("date", iso),
+    "time": ("time", hhmm),
+    "status": ("status", enum_value),
+    "notes": "notes",
+    "patient": Nested("patient", {
+        "id": "id",
+        "name": "user.name",
+        "age": "age",
+        "gender": "gender",
+        "phone": "phone",
+    }),
+}, "doctor_appointment")
+
+# Patient's appointment list and detail
+patient_appointment = compile_shape({
+    "id": "id",
+    "date": ("date", iso),
+    "time": ("time", hhmm),
+    "status": ("status", enum_value),
+    "doctor": Nested("doctor", DOCTOR_BRIEF),
+}, "patient_appointment")
+
+patient_appointment_detail = compile_shape({
+    "id": "id",
+    "date": ("date", iso),
+    "time": ("time", hhmm),
+    "status": ("status", enum_value),
+    "notes": "notes",
+    "doctor": Nested("doctor", {
+        **DOCTOR_BRIEF,
+        "experience": "experience_years",
+        "fees": "consultation_fee",
+    }),
+}, "patient_appointment_detail")
+
+# One visit in a patient's treatment history (admin and doctor views),
+# built from an appointment that has a medical record.
+history_record = compile_shape({
+    "id": "medical_record.id",
+    "doctor": Nested("doctor", DOCTOR_BRIEF),
+    "date": ("date", iso),
+    "time": ("time", hhmm),
+    "visit_type": "medical_record.visit_type",
+    "tests": "medical_record.tests_done",
+    "diagnosis": "medical_record.diagnosis",
+    "medicines": "medical_record.medicines",
+    "prescription": "medical_record.prescription",
+    "notes": "medical_record.notes",
+}, "history_record")
+
+# Patient's own records: the full record plus doctor and date
+patient_record = compile_shape({
+    "id": "medical_record.id",
+    "appointment_id": "id",
+    "visit_type": "medical_record.visit_type",
+    "tests_done": "medical_record.tests_done",
+    "diagnosis": "medical_record.diagnosis",
+    "medicines": "medical_record.medicines",
+    "prescription": "medical_record.prescription",
+    "notes": "medical_record.notes",
+    "created_at": ("medical_record.created_at", iso),
+    "updated_at": ("medical_record.updated_at", iso),
+    "doctor": Nested("doctor", DOCTOR_BRIEF),
+    "date": ("date", iso),
+}, "patient_record")
+
+
+# ---------------------------------------------------------------------------
+# Output representation
+# ---------------------------------------------------------------------------
+
+def output_orjson(data, code, headers=None):
+    """Flask-RESTful representation for application/json backed by orjson."""
+    # OPT_NON_STR_KEYS keeps int-keyed dicts working as they did with json.
+    resp = make_response(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), code)
+    resp.headers.extend(headers or {})
+    resp.headers["Content-Type"] = "application/json"
+    return resp
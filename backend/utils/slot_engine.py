@@ -0,0 +1,100 @@
+import heapq
+from datetime import datetime, time
+
+from models import Appointment, AppointmentStatus
+from utils.schedule import open_windows
+
+SLOT_MINUTES = 30
+
+
+def slot_index(t: time):
+    """Position of a time inside the day's 48 half-hour slots."""
+    return (t.hour * 60 + t.minute) // SLOT_MINUTES
+
+
+def slot_time(index: int):
+    minutes = index * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def window_mask(start: time, end: time):
+    """Bitmap with one bit set per 30-minute slot in [start, end)."""
+    first = slot_index(start)
+    last = slot_index(end)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def booked_masks(session, doctor_ids, start_date, end_date):
+    """
+    {(doctor_id, date): bitmap} of non-cancelled bookings, in one range query.
+    """
+    rows = (
+        session.query(Appointment.doctor_id, Appointment.date, Appointment.time)
+        .filter(Appointment.doctor_id.in_(doctor_ids))
+        .filter(Appointment.date >= start_date)
+        .filter(Appointment.date <= end_date)
+        .filter(Appointment.status != AppointmentStatus.CANCELLED)
+        .all()
+    )
+
+    masks = {}
+    for doctor_id, d, t in rows:
+        key = (doctor_id, d)
+        masks[key] = masks.get(key, 0) | (1 << slot_index(t))
+    return masks
+
+
+def free_slots(session, doctor_id, start_date, end_date, now=None):
+    """
+    Every free 30-minute slot for a doctor between start_date and end_date
+    (inclusive), weekly templates included. Costs three queries regardless
+    of the range length.
+
+    Slots on `now`'s date that have already started are left out.
+    """
+    windows = open_windows(session, [doctor_id], start_date, end_date)
+    booked = booked_masks(session, [doctor_id], start_date, end_date)
+
+    return list(_iter_free(windows, booked, now or datetime.now()))
+
+
+def earliest_free_slots(session, doctor_ids, start_date, end_date, limit, now=None):
+    """
+    The `limit` earliest free slots across several doctors, ordered by
+    date, time and doctor. Costs three queries regardless of how many
+    doctors are searched.
+    """
+    if not doctor_ids:
+        return []
+
+    windows = open_windows(session, doctor_ids, start_date, end_date)
+    booked = booked_masks(session, doctor_ids, start_date, end_date)
+
+    return heapq.nsmallest(
+        limit,
+        _iter_free(windows, booked, now or datetime.now()),
+        key=lambda s: (s["date"], s["time"], s["doctor_id"]),
+    )
+
+
+def _iter_free(windows, booked, now):
+    for w in windows:
+        free = window_mask(w.start_time, w.end_time) & ~booked.get((w.doctor_id, w.date), 0)
+
+        if w.date == now.date():
+            free &= ~((1 << (slot_index(now.time()) + 1)) - 1)
+
+        while free:
+            low = free & -free
+            idx = low.bit_length() - 1
+            free ^= low
+
+            yield {
+                "id": w.id,
+                "doctor_id": w.doctor_id,
+                "date": w.date,
+                "time": slot_time(idx),
+                "slot_type": w.slot_type,
+            }
@@ -30,8 +30,8 @@ export default {
   },
 
 
-  getAppointments() {
-    return axios.get("/admin/appointments");
+  getAppointments(params = {}) {
+    return axios.get("/admin/appointments", { params });
   },
   
   updateAppointmentStatus(id, data) {
@@ -9,5 +9,9 @@ export default {
   save(payload) {
     return axios.post("/doctor/availability", payload);
   },
+
+  saveBulk(slots) {
+    return axios.post("/doctor/availability/bulk", { slots });
+  },
 };
 
@@ -7,4 +7,7 @@ export default {
   startExport() {
     return axios.post("/patient/export-treatments");
   },
+  exportStatus(taskId) {
+    return axios.get(`/patient/export-treatments/${taskId}`);
+  },
 };